@@ -0,0 +1,73 @@
+"""Single-flight coalescing of identical in-flight requests."""
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple, TypeVar
+
+from app.core.text_normalization import normalize_unicode
+from app.core.ttl_cache import content_hash
+
+T = TypeVar("T")
+
+
+def coalescing_key(route: str, user_id: str, message: str) -> Tuple[str, str, str]:
+    """
+    Requests coalesce only when route, user and normalised message all match,
+    so two users sending the same prompt each get their own run (and memory write).
+    """
+    return route, user_id, content_hash(normalize_unicode(message))
+
+
+def parse_routes(value: str) -> frozenset:
+    """Comma-separated route list from settings; empty disables coalescing."""
+    return frozenset(route.strip() for route in value.split(",") if route.strip())
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time; concurrent callers with the same key
+    await the leader's result (or exception) instead of recomputing it.
+
+    The call runs as its own task, so a leader whose client goes away does
+    not cancel the work the followers are waiting on. Nothing is cached: once
+    the call finishes, the next request with that key runs again.
+    """
+
+    def __init__(self, routes: Iterable[str] = ()) -> None:
+        self.routes = frozenset(routes)
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    def enabled_for(self, route: str) -> bool:
+        return route in self.routes
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            with self._lock:
+                self._leaders += 1
+        else:
+            with self._lock:
+                self._coalesced += 1
+        return await asyncio.shield(future)
+
+    async def run(self, route: str, user_id: str, message: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Coalesces ``fn`` when ``route`` is configured for it, otherwise just awaits it."""
+        if not self.enabled_for(route):
+            return await fn()
+        return await self.do(coalescing_key(route, user_id, message), fn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": sorted(self.routes),
+                "inflight": len(self._inflight),
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+            }
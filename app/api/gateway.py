@@ -1,25 +1,50 @@
 # app/api/gateway.py
+import asyncio
+import json
 import logging
 import time
 from contextlib import asynccontextmanager
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles  # [NEW] เพื่อโชว์หน้าเว็บ
 from pydantic import BaseModel, ConfigDict, model_validator
 
 # [IMPORT] Core Systems
+from app.api.coalescing import SingleFlight, parse_routes
+from app.api.monitoring import get_metrics, register_metrics_source
+from app.core.config import get_settings
+from app.core.execution import StageOverloadedError
+from app.core.logging_middleware import LoggingMiddleware, setup_logging, shutdown_logging
+from app.core.metrics import SHIELD_SPAN, get_metrics_registry, span
+from app.core.model_budget import get_model_budget
+from app.core.warmup import FAILED, PENDING, WARMING, WarmupManager
+from app.emotion.neuro_empathic_mirror import NeuroEmpathicMirror
+from app.memory.infinity_memory import InfinityMemorySystem
 from app.personality.namo_persona_core import NamoPersonaCore
 from app.safety.divine_shield import DivineShield
+from app.safety.pipeline import SafetyPipeline
 
-# Setup Logger
-logging.basicConfig(level=logging.INFO)
+# Setup Logger (file/console output is written by a background queue listener)
+setup_logging()
 logger = logging.getLogger("NamoGateway")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    if get_settings().WARMUP_MODE.lower() == "eager":
+        await asyncio.to_thread(warmup.warm_all)
+    else:
+        warmup.start()
     logger.info("🚀 NamoNexus Gateway Initialized. Consciousness is Online.")
     yield
+    # Let background memory stores finish before their pools go away
+    await persona.drain()
+    persona.executor.shutdown(wait=True)
+    # Drain buffered memory writes before the process exits
+    if persona.infinity_memory is not None:
+        persona.infinity_memory.close()
+    shutdown_logging()
 
 app = FastAPI(
     title="NamoNexus API",
@@ -27,10 +52,52 @@ app = FastAPI(
     description="The Interface to Digital Consciousness",
     lifespan=lifespan,
 )
+app.add_middleware(LoggingMiddleware)
 
 # [INIT] Instantiate Core Systems
-persona = NamoPersonaCore()
+# The persona starts degraded (simulation-mode emotions, no long-term memory) so
+# the server can bind immediately; the real subsystems are swapped in by warm-up.
+persona = NamoPersonaCore(
+    empathic_mirror=NeuroEmpathicMirror(simulation=True),
+    infinity_memory=None,
+)
 shield = DivineShield()
+safety = SafetyPipeline(shield=shield)
+coalescer = SingleFlight(parse_routes(get_settings().COALESCE_ROUTES))
+
+warmup = WarmupManager()
+warmup.register("emotion_model", NeuroEmpathicMirror, lambda mirror: setattr(persona, "empathic_mirror", mirror))
+warmup.register("memory", InfinityMemorySystem, lambda memory: setattr(persona, "infinity_memory", memory))
+
+
+def _memory_stats(name: str) -> Dict[str, Any]:
+    memory = persona.infinity_memory
+    if memory is None:
+        return {"ready": False}
+    return memory.hot_tier.stats() if name == "hot_tier" else memory.write_stats()
+
+
+register_metrics_source("emotion_batcher", lambda: persona.empathic_mirror.batcher_stats())
+register_metrics_source("execution_stages", persona.executor.stats)
+register_metrics_source("memory_hot_tier", lambda: _memory_stats("hot_tier"))
+register_metrics_source("memory_write_behind", lambda: _memory_stats("write_behind"))
+register_metrics_source("memory_background_stores", persona.store_stats)
+register_metrics_source("policies", shield.policies.stats)
+register_metrics_source("stage_latency", get_metrics_registry().stats)
+register_metrics_source("safety_verdict_cache", safety.verdicts.stats)
+register_metrics_source("emotion_verdict_cache", lambda: persona.empathic_mirror.verdicts.stats())
+register_metrics_source("warmup", warmup.status)
+register_metrics_source("interact_coalescing", coalescer.stats)
+
+
+@app.exception_handler(StageOverloadedError)
+async def stage_overloaded_handler(request: Request, exc: StageOverloadedError):
+    # Backpressure: shed load instead of queueing unbounded latency
+    return JSONResponse(
+        status_code=503,
+        content={"status": "overloaded", "detail": str(exc), "stage": exc.stage},
+        headers={"Retry-After": "1"},
+    )
 
 class UserQuery(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -51,10 +118,43 @@ class UserQuery(BaseModel):
         self.message = content
         return self
 
+class BatchQuery(BaseModel):
+    items: List[UserQuery]
+
+    @model_validator(mode="after")
+    def ensure_size(self):
+        limit = get_settings().INTERACT_BATCH_MAX_ITEMS
+        if not self.items:
+            raise ValueError("items must not be empty")
+        if len(self.items) > limit:
+            raise ValueError(f"at most {limit} items per batch")
+        return self
+
 # [MOVED] ย้าย Status เช็คระบบไปที่ /api/status แทน
 @app.get("/api/status")
 def api_status():
-    return {"system": "NamoNexus", "status": "online", "message": "May wisdom guide you."}
+    return {
+        "system": "NamoNexus",
+        "status": "online",
+        "message": "May wisdom guide you.",
+        # Which model variant each component runs and why (memory budget decisions)
+        "models": get_model_budget().stats(),
+        # Embedder variant and the memory collection it reads and writes
+        "memory": persona.infinity_memory.storage_info() if persona.infinity_memory is not None else None,
+    }
+
+@app.get("/api/metrics")
+def api_metrics():
+    # Process + component stats (inference queue depth, batch-size histogram, ...)
+    return get_metrics()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Per-stage latency histograms (p50/p95/p99) in Prometheus text format
+    return PlainTextResponse(
+        get_metrics_registry().render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
 
 @app.get("/healthz")
 def healthz():
@@ -63,24 +163,26 @@ def healthz():
 @app.get("/readyz")
 def readyz():
     # ตรวจสอบเบื้องต้นเพื่อให้ Cloud Run รู้ว่าพร้อมรับแขก
-    return {"status": "ready"}
+    # 503 while models are still loading; a failed component leaves the
+    # service permanently degraded (simulation mode), which is still ready.
+    components = warmup.status()
+    states = {component["state"] for component in components.values()}
+    if states & {PENDING, WARMING}:
+        return JSONResponse(status_code=503, content={"status": "warming", "components": components})
+    status = "degraded" if FAILED in states else "ready"
+    return {"status": status, "components": components}
 
-@app.post("/interact")
-async def interact(query: UserQuery) -> Dict[str, Any]:
-    start_time = time.time()
-    assessment = shield.protect(query.message)
-    
-    if not assessment.is_safe:
-        return {
-            "user": query.user_id,
-            "response": "ขออภัยครับ ระบบตรวจพบเนื้อหาที่ไม่เหมาะสม",
-            "risk_score": assessment.risk_level,
-            "status": "blocked"
-        }
+def _blocked_payload(query: UserQuery, assessment) -> Dict[str, Any]:
+    return {
+        "user": query.user_id,
+        "response": assessment.safe_reply or "ขออภัยครับ ระบบตรวจพบเนื้อหาที่ไม่เหมาะสม",
+        "risk_score": assessment.risk_level,
+        "status": "blocked"
+    }
 
-    result = await persona.process(query.message)
-    process_time = round(time.time() - start_time, 3)
 
+def _interact_payload(query: UserQuery, result: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+    process_time = round(time.perf_counter() - start_time, 3)
     return {
         "user": query.user_id,
         "response": result.get("reflection_text", ""),
@@ -90,10 +192,91 @@ async def interact(query: UserQuery) -> Dict[str, Any]:
             "tone": result.get("tone"),
             "coherence": result.get("coherence"),
             "memory_context": result.get("memory_summary"),
-            "process_time": process_time
+            "process_time": process_time,
+            "stage_timings_ms": result.get("stage_timings_ms", {}),
+            "degraded": not warmup.is_ready(),
         }
     }
 
+
+@app.post("/interact")
+async def interact(query: UserQuery) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    with span(SHIELD_SPAN):
+        assessment = safety.assess(query.message)
+
+    if not assessment.is_safe:
+        return _blocked_payload(query, assessment)
+
+    # Retries / duplicate prompts from the same user share one in-flight run
+    result = await coalescer.run(
+        "/interact",
+        query.user_id,
+        query.message,
+        lambda: persona.process(query.message, user_id=query.user_id),
+    )
+    return _interact_payload(query, result, start_time)
+
+
+@app.post("/interact/stream")
+async def interact_stream(query: UserQuery) -> StreamingResponse:
+    """
+    Same pipeline as /interact, streamed as NDJSON: one JSON object per line
+    (``empathy``, ``memory``, ``reflection``, then ``done`` carrying the
+    regular /interact body) so the empathic reply renders before recall and
+    reflection finish.
+    """
+    start_time = time.perf_counter()
+    with span(SHIELD_SPAN):
+        assessment = safety.assess(query.message)
+
+    async def events() -> AsyncIterator[str]:
+        if not assessment.is_safe:
+            yield json.dumps({"event": "blocked", **_blocked_payload(query, assessment)}, ensure_ascii=False) + "\n"
+            return
+        try:
+            async for event in persona.process_stream(query.message, user_id=query.user_id):
+                if event["event"] == "done":
+                    event = {"event": "done", **_interact_payload(query, event["result"], start_time)}
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except StageOverloadedError as exc:
+            # Headers are already sent, so overload is reported in-band
+            yield json.dumps({"event": "error", "status": "overloaded", "stage": exc.stage}) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@app.post("/interact/batch")
+async def interact_batch(batch: BatchQuery) -> Dict[str, Any]:
+    """
+    Bulk /interact for offline evaluation and back-fills: one safety pass,
+    one batched emotion call, one batched embedding call, one Chroma query
+    per user and one bulk memory write. Results keep the input order, each
+    with its own ``status`` (``ok`` or ``blocked``).
+    """
+    start_time = time.perf_counter()
+    with span(SHIELD_SPAN):
+        assessments = safety.assess_batch([query.message for query in batch.items])
+
+    allowed = [i for i, assessment in enumerate(assessments) if assessment.is_safe]
+    processed = await persona.process_batch(
+        [(batch.items[i].message, batch.items[i].user_id) for i in allowed]
+    )
+
+    replies = dict(zip(allowed, processed))
+    results: List[Dict[str, Any]] = []
+    for i, (query, assessment) in enumerate(zip(batch.items, assessments)):
+        if i in replies:
+            results.append({"index": i, "status": "ok", **_interact_payload(query, replies[i], start_time)})
+        else:
+            results.append({"index": i, **_blocked_payload(query, assessment)})
+
+    return {
+        "count": len(results),
+        "blocked": len(results) - len(allowed),
+        "process_time": round(time.perf_counter() - start_time, 3),
+        "results": results,
+    }
+
 @app.post("/reflect")
 async def reflect(query: UserQuery):
     return await interact(query)
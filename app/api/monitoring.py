@@ -1,21 +1,47 @@
 """System monitoring utilities."""
 from __future__ import annotations
 
+import logging
 import time
-from typing import Any
+from typing import Any, Callable
 
-try:
-    import psutil
-except ImportError:  # pragma: no cover - optional dependency
-    psutil = None  # type: ignore
+from app.core.lazy_import import lazy_import
+
+psutil = lazy_import("psutil")  # optional; imported on the first metrics call
+
+logger = logging.getLogger(__name__)
+
+# Component-level stats (queues, caches, tiers) merged into every metrics snapshot.
+_METRICS_SOURCES: dict[str, Callable[[], dict[str, Any]]] = {}
+
+
+def register_metrics_source(name: str, source: Callable[[], dict[str, Any]]) -> None:
+    """Registers a callable whose stats dict is reported under ``name``."""
+    _METRICS_SOURCES[name] = source
+
+
+def unregister_metrics_source(name: str) -> None:
+    _METRICS_SOURCES.pop(name, None)
+
+
+def collect_component_metrics() -> dict[str, Any]:
+    components: dict[str, Any] = {}
+    for name, source in list(_METRICS_SOURCES.items()):
+        try:
+            components[name] = source()
+        except Exception as exc:
+            logger.warning("Metrics source %s failed: %s", name, exc)
+            components[name] = {"error": str(exc)}
+    return components
 
 
 def get_metrics() -> dict[str, Any]:
     metrics: dict[str, Any] = {"timestamp": time.time()}
-    if psutil:
+    if psutil.available:
         metrics["cpu_percent"] = psutil.cpu_percent(interval=0.1)
         metrics["memory_percent"] = psutil.virtual_memory().percent
     else:
         metrics["cpu_percent"] = None
         metrics["memory_percent"] = None
+    metrics["components"] = collect_component_metrics()
     return metrics
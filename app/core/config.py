@@ -34,10 +34,74 @@ class Settings(BaseSettings):
     # Memory and storage
     MEMORY_PATH: str = "data/memory_log.json"
     MAX_MEMORY_ENTRIES: int = 200
+    MEMORY_COMPACT_FACTOR: int = 2  # compact the journal at factor x MAX_MEMORY_ENTRIES lines
     CHROMA_HOST: str | None = None
     CHROMA_PORT: int | None = None
     CHROMA_SSL: bool = True
     CHROMA_AUTH_TOKEN: str | None = None
+    # Fetch k x factor candidates and re-rank with similarity (1 = original scoring)
+    MEMORY_OVERFETCH_FACTOR: int = 1
+    NODE_ID: str | None = None  # 4 Crockford base32 chars; derived from host + pid when unset
+    MEMORY_DEDUP_WINDOW_SECONDS: float = 300.0
+    # "sentence_transformers" (falls back to hashing when unavailable) or "hashing"
+    EMBEDDER_BACKEND: str = "sentence_transformers"
+    EMBEDDING_DIM: int = 384
+    EMBEDDING_CACHE_SIZE: int = 4096
+    EMBEDDING_CACHE_TTL_SECONDS: float = 3600.0
+    # Short-term memory tier (falls back to an in-process store when Redis is unreachable)
+    REDIS_URL: str = "redis://localhost:6379/0"
+    HOT_TIER_TTL_SECONDS: int = 1800
+    HOT_TIER_MAX_TURNS: int = 20
+    # Write-behind buffer for Chroma inserts (overflow policy: "drop" or "block")
+    MEMORY_WRITE_BEHIND: bool = True
+    MEMORY_FLUSH_BATCH_SIZE: int = 64
+    MEMORY_FLUSH_INTERVAL_MS: float = 200.0
+    MEMORY_WRITE_QUEUE_SIZE: int = 2048
+    MEMORY_WRITE_OVERFLOW_POLICY: str = "drop"
+    MEMORY_WRITE_BLOCK_TIMEOUT_S: float = 1.0
+
+    # Policy store (threat patterns + empathy templates); the file is re-checked
+    # by mtime at most once per interval and hot-swapped when it changes
+    POLICY_PATH: str | None = None  # defaults to app/core/policies.json
+    POLICY_RELOAD_INTERVAL_SECONDS: float = 2.0
+
+    # Cache of safety / emotion verdicts for repeated inputs (size 0 disables)
+    VERDICT_CACHE_SIZE: int = 4096
+    VERDICT_CACHE_TTL_SECONDS: float = 600.0
+
+    # Memory (MB) this process may spend on in-process models; components
+    # degrade to smaller variants (onnx-int8, hashing, simulation) to fit
+    MODEL_MEMORY_BUDGET_MB: int = 1536
+
+    # Emotion classifier backend: "pytorch" (transformers pipeline) or "onnx"
+    # (int8-quantized model on onnxruntime; falls back to pytorch if unavailable)
+    EMOTION_BACKEND: str = "pytorch"
+    ONNX_MODEL_DIR: str = "models/emotion-onnx-int8"
+    ONNX_INTRA_OP_THREADS: int = 0  # 0 = one per physical core
+
+    # Unix socket of the shared inference sidecar (python -m app.inference.sidecar);
+    # unset or unreachable = models are loaded in-process
+    INFERENCE_SOCKET: str | None = None
+
+    # Emotion inference micro-batching (max batch size <= 1 disables batching)
+    EMOTION_BATCH_MAX_SIZE: int = 16
+    EMOTION_BATCH_WINDOW_MS: float = 5.0
+
+    # Model / vector DB warm-up: "background" serves simulation-mode replies
+    # until components are warm, "eager" loads everything before serving
+    WARMUP_MODE: str = "background"
+
+    # Execution stages (thread pools + admission queue; overflow returns 503)
+    EXECUTOR_MODEL_WORKERS: int = 16
+    EXECUTOR_MODEL_QUEUE: int = 64
+    EXECUTOR_IO_WORKERS: int = 8
+    EXECUTOR_IO_QUEUE: int = 128
+
+    # Routes where concurrent identical requests (same user + normalised message)
+    # share one persona run; comma-separated, empty disables coalescing
+    COALESCE_ROUTES: str = "/interact"
+    # Largest number of items accepted by POST /interact/batch
+    INTERACT_BATCH_MAX_ITEMS: int = 256
 
     # [NEW] The Golden Ratio Constant
     PHI: float = 1.61803398875
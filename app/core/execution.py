@@ -0,0 +1,126 @@
+"""Executor-backed execution layer that keeps blocking work off the event loop."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Stage names used by the persona pipeline.
+MODEL_STAGE = "model"  # transformer / embedding inference
+IO_STAGE = "io"  # Chroma reads and writes
+
+
+class StageOverloadedError(RuntimeError):
+    """Raised when a stage already holds as much work as it is allowed to queue."""
+
+    def __init__(self, stage: str) -> None:
+        super().__init__(f"Execution stage '{stage}' is at capacity")
+        self.stage = stage
+
+
+class ExecutionStage:
+    """
+    A bounded thread pool with admission control.
+
+    At most ``max_workers`` calls run concurrently and at most ``max_queue`` more
+    may wait for a worker; anything beyond that is rejected immediately with
+    :class:`StageOverloadedError` instead of piling up latency.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise StageOverloadedError(self.name)
+            self._admitted += 1
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # Created lazily so a stage can be reused after an app shutdown/startup cycle
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"namo-{self.name}"
+                )
+            return self._pool
+
+    def _release(self, _: object = None) -> None:
+        with self._lock:
+            self._admitted -= 1
+            self._completed += 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self._admit()
+        try:
+            future = self._get_pool().submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Released when the worker is done, not when the awaiting coroutine is:
+        # a cancelled caller must keep holding its slot while the thread still runs
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self._admitted,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+
+
+class StageExecutor:
+    """
+    Routes blocking calls to per-stage thread pools.
+
+    The ``model`` stage fronts transformer and embedding inference; its workers
+    mostly wait on the emotion micro-batcher's dedicated inference thread, so it is
+    sized to let a full batch accumulate. The ``io`` stage fronts Chroma calls.
+    """
+
+    def __init__(self) -> None:
+        settings = get_settings()
+        self.stages: Dict[str, ExecutionStage] = {
+            MODEL_STAGE: ExecutionStage(
+                MODEL_STAGE, settings.EXECUTOR_MODEL_WORKERS, settings.EXECUTOR_MODEL_QUEUE
+            ),
+            IO_STAGE: ExecutionStage(IO_STAGE, settings.EXECUTOR_IO_WORKERS, settings.EXECUTOR_IO_QUEUE),
+        }
+
+    async def run(self, stage: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        return await self.stages[stage].run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for stage in self.stages.values():
+            stage.shutdown(wait=wait)
+        logger.info("Execution stages shut down.")
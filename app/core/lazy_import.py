@@ -0,0 +1,62 @@
+"""Deferred imports for optional heavy dependencies (transformers, chromadb, ...)."""
+from __future__ import annotations
+
+import importlib
+import threading
+from functools import lru_cache
+from importlib.util import find_spec
+from types import ModuleType
+from typing import Any, Optional
+
+
+@lru_cache(maxsize=None)
+def module_available(name: str) -> bool:
+    """True if ``name`` is installed; checked via the import system without importing it."""
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """
+    Placeholder for an optional module that is imported on first attribute
+    access, so merely importing ``app`` never pays for it. ``available``
+    answers "is it installed?" without triggering the import; ``load()``
+    raises ImportError (or whatever the module raises) when it cannot be used.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._lazy_name = name
+        self._lazy_module: Optional[ModuleType] = None
+        self._lazy_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return module_available(self._lazy_name)
+
+    @property
+    def loaded(self) -> bool:
+        return self._lazy_module is not None
+
+    def load(self) -> ModuleType:
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    self._lazy_module = importlib.import_module(self._lazy_name)
+                module = self._lazy_module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr.startswith("_lazy_"):
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module {self._lazy_name!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -1,22 +1,41 @@
-"""FastAPI logging middleware for request tracing and metrics."""
+"""ASGI logging middleware for request tracing and metrics."""
 from __future__ import annotations
 
+import itertools
 import logging
+import os
+import queue
 import time
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from typing import Awaitable, Callable
-from uuid import uuid4
+from typing import List, Optional
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import get_settings
 
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+# Request IDs: a per-process prefix plus a counter -- unique across workers, no uuid4 per request
+_REQUEST_ID_PREFIX = f"{os.getpid():x}{os.urandom(3).hex()}"
+_request_counter = itertools.count(1)
+
+
+def next_request_id() -> str:
+    return f"{_REQUEST_ID_PREFIX}-{next(_request_counter):x}"
+
 
 def setup_logging() -> None:
-    """Configure root logging based on application settings."""
+    """
+    Configure root logging based on application settings.
+
+    The file and console handlers run on a ``QueueListener`` thread; the root
+    logger only gets a ``QueueHandler``, so a slow disk (or a log rotation)
+    never blocks the event loop. Existing root handlers are left alone.
+    """
+    global _listener, _queue_handler
 
     settings = get_settings()
     if not settings.FEATURE_FLAGS.get("ENABLE_LOGGING", True):
@@ -40,34 +59,67 @@ def setup_logging() -> None:
     stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = QueueHandler(log_queue)
+    _listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    logger.addHandler(_queue_handler)
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware that logs HTTP method, path, status, and latency with a request ID."""
+def shutdown_logging() -> None:
+    """Flushes queued records and puts the real handlers back on the root logger."""
+    global _listener, _queue_handler
 
-    async def dispatch(
-        self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
-    ) -> Response:
-        settings = get_settings()
-        if not settings.FEATURE_FLAGS.get("ENABLE_LOGGING", True):
-            return await call_next(request)
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger()
+    logger.removeHandler(_queue_handler)
+    handlers: List[logging.Handler] = list(_listener.handlers)
+    for handler in handlers:
+        logger.addHandler(handler)
+    _listener = _queue_handler = None
 
-        request_id = str(uuid4())
-        start_time = time.perf_counter()
 
-        response = await call_next(request)
-        elapsed_ms = (time.perf_counter() - start_time) * 1000
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware that logs HTTP method, path, status, and latency with a request ID.
+
+    Unlike ``BaseHTTPMiddleware`` it wraps only ``send``: no extra task or
+    body stream per request, and streaming responses pass straight through.
+    Latency is measured up to the end of the response body.
+    """
 
-        logging.getLogger(__name__).info(
-            "%s %s -> %s in %.2fms [req_id=%s]",
-            request.method,
-            request.url.path,
-            response.status_code,
-            elapsed_ms,
-            request_id,
-        )
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.enabled = get_settings().FEATURE_FLAGS.get("ENABLE_LOGGING", True)
+        self.logger = logging.getLogger(__name__)
 
-        response.headers["X-Request-ID"] = request_id
-        return response
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next_request_id()
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            self.logger.info(
+                "%s %s -> %s in %.2fms [req_id=%s]",
+                scope["method"],
+                scope["path"],
+                status_code,
+                elapsed_ms,
+                request_id,
+            )
@@ -0,0 +1,181 @@
+"""Low-overhead latency histograms for pipeline stages, exportable as Prometheus text."""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds: 0.1ms doubling up to ~26s, plus the implicit +Inf bucket.
+DEFAULT_BUCKETS: Tuple[float, ...] = tuple(0.0001 * 2**i for i in range(19))
+QUANTILES: Tuple[float, ...] = (0.5, 0.95, 0.99)
+
+# Stage names recorded by the request path.
+SHIELD_SPAN = "shield"
+EMOTION_SPAN = "emotion"
+EMBEDDING_SPAN = "embedding"
+CHROMA_ADD_SPAN = "chroma_add"
+CHROMA_QUERY_SPAN = "chroma_query"
+REFLECTION_SPAN = "reflection"
+
+
+class _Shard:
+    __slots__ = ("counts", "total")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.total = 0.0
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram with one shard per recording thread.
+
+    ``observe`` only touches the calling thread's shard, so the hot path takes
+    no lock (the lock guards shard creation, once per thread). Readers sum the
+    shards; a snapshot taken mid-update may be off by the in-flight sample,
+    which is fine for monitoring. Quantiles are interpolated within buckets.
+    """
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard(len(self.buckets) + 1)
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def observe(self, seconds: float) -> None:
+        shard = self._shard()
+        shard.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        shard.total += seconds
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Per-bucket counts (last one is +Inf) and the sum of observations."""
+        with self._lock:
+            shards = list(self._shards)
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for shard in shards:
+            for index, value in enumerate(shard.counts):
+                counts[index] += value
+            total += shard.total
+        return counts, total
+
+    def quantile(self, q: float, counts: Optional[List[int]] = None) -> Optional[float]:
+        counts = counts if counts is not None else self.snapshot()[0]
+        observed = sum(counts)
+        if observed == 0:
+            return None
+        rank = q * observed
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]  # beyond the last bound: report the bound
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]  # pragma: no cover - rank never exceeds the count
+
+    def stats(self) -> Dict[str, Any]:
+        counts, total = self.snapshot()
+        observed = sum(counts)
+        stats: Dict[str, Any] = {"count": observed, "sum_ms": round(total * 1000, 3)}
+        for q in QUANTILES:
+            value = self.quantile(q, counts)
+            stats[f"p{int(q * 100)}_ms"] = round(value * 1000, 3) if value is not None else None
+        return stats
+
+    def prometheus_lines(self, metric: str) -> List[str]:
+        counts, total = self.snapshot()
+        label = f'stage="{self.name}"'
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label},le="{bound:g}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {cumulative}')
+        lines.append(f"{metric}_sum{{{label}}} {total:.6f}")
+        lines.append(f"{metric}_count{{{label}}} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named stage histograms plus the ``span`` timer that feeds them."""
+
+    METRIC = "namo_stage_latency_seconds"
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, LatencyHistogram(name, self.buckets))
+        return histogram
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Records the wall time of the block on the monotonic clock, even if it raises."""
+        histogram = self.histogram(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def _sorted(self) -> List[Tuple[str, LatencyHistogram]]:
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: histogram.stats() for name, histogram in self._sorted()}
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition (format 0.0.4) of every stage histogram and its p50/p95/p99."""
+        histograms = self._sorted()
+        lines = [
+            f"# HELP {self.METRIC} Latency of request pipeline stages.",
+            f"# TYPE {self.METRIC} histogram",
+        ]
+        for _, histogram in histograms:
+            lines.extend(histogram.prometheus_lines(self.METRIC))
+
+        quantile_metric = f"{self.METRIC}_quantile"
+        lines += [
+            f"# HELP {quantile_metric} Bucket-interpolated latency quantiles since process start.",
+            f"# TYPE {quantile_metric} gauge",
+        ]
+        for name, histogram in histograms:
+            counts = histogram.snapshot()[0]
+            for q in QUANTILES:
+                value = histogram.quantile(q, counts)
+                if value is not None:
+                    lines.append(f'{quantile_metric}{{stage="{name}",quantile="{q:g}"}} {value:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache(maxsize=1)
+def get_metrics_registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+def span(name: str):
+    """Shorthand for ``get_metrics_registry().span(name)``."""
+    return get_metrics_registry().span(name)
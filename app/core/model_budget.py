@@ -0,0 +1,144 @@
+"""Explicit memory budget for in-process models, with smaller-variant fallback."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+EMOTION_CLASSIFIER = "emotion_classifier"
+EMBEDDER = "embedder"
+
+
+@dataclass(frozen=True)
+class ModelVariant:
+    name: str
+    footprint_mb: int  # estimated resident size once loaded (weights + runtime buffers)
+
+
+# Every component ends with a zero-footprint variant so allocation always succeeds.
+MODEL_VARIANTS: Mapping[str, Tuple[ModelVariant, ...]] = {
+    EMOTION_CLASSIFIER: (
+        ModelVariant("pytorch", 700),  # DistilBERT fp32 + torch runtime
+        ModelVariant("onnx-int8", 200),  # int8 weights on onnxruntime
+        ModelVariant("simulation", 0),  # keyword heuristics
+    ),
+    EMBEDDER: (
+        ModelVariant("minilm", 300),  # all-MiniLM-L6-v2 via sentence-transformers
+        ModelVariant("hashing", 0),  # HashingEmbedder
+    ),
+}
+
+
+@dataclass
+class _Allocation:
+    candidates: Tuple[ModelVariant, ...]
+    index: int
+    reason: str
+    decided_at: float
+
+    @property
+    def variant(self) -> ModelVariant:
+        return self.candidates[self.index]
+
+
+class ModelBudget:
+    """
+    Hands out model loads against a fixed per-process budget.
+
+    Unlike a free-memory snapshot, the decision does not depend on what other
+    processes happen to be doing at that instant: each component asks for its
+    variants in order of preference and gets the first one whose estimated
+    footprint fits in what the budget has left. A failed load is handed back
+    with ``fallback`` and the next fitting variant is chosen. Re-allocating a
+    component first releases its previous reservation.
+    """
+
+    def __init__(self, budget_mb: int, variants: Mapping[str, Sequence[ModelVariant]] = MODEL_VARIANTS) -> None:
+        self.budget_mb = int(budget_mb)
+        self.variants = {component: tuple(options) for component, options in variants.items()}
+        self._allocations: Dict[str, _Allocation] = {}
+        self._external: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _used_mb(self, exclude: Optional[str] = None) -> int:
+        return sum(a.variant.footprint_mb for name, a in self._allocations.items() if name != exclude)
+
+    def _variant(self, component: str, name: str) -> ModelVariant:
+        for variant in self.variants[component]:
+            if variant.name == name:
+                return variant
+        raise KeyError(f"unknown {component} variant: {name}")
+
+    def _pick(self, component: str, candidates: Tuple[ModelVariant, ...], start: int, why: str) -> ModelVariant:
+        remaining = self.budget_mb - self._used_mb(exclude=component)
+        for index in range(start, len(candidates)):
+            variant = candidates[index]
+            if variant.footprint_mb <= remaining:
+                skipped = [c.name for c in candidates[start:index]]
+                reason = why if not skipped else f"{why}; {', '.join(skipped)} over budget ({remaining} MB left)"
+                self._allocations[component] = _Allocation(candidates, index, reason, time.time())
+                self._external.pop(component, None)
+                logger.info(f"Model budget: {component} -> {variant.name} ({variant.footprint_mb} MB). {reason}")
+                return variant
+        raise RuntimeError(f"no {component} variant fits the model budget")
+
+    def allocate(self, component: str, preference: Optional[Sequence[str]] = None) -> ModelVariant:
+        """
+        Reserves the first variant in ``preference`` order (default: as listed
+        in ``MODEL_VARIANTS``) that fits; the zero-footprint variant is always
+        appended as the last resort.
+        """
+        options = self.variants[component]
+        names = list(preference or [variant.name for variant in options])
+        if options[-1].name not in names:
+            names.append(options[-1].name)
+        candidates = tuple(self._variant(component, name) for name in names)
+        with self._lock:
+            return self._pick(component, candidates, 0, f"preferred {candidates[0].name}")
+
+    def fallback(self, component: str, reason: str) -> ModelVariant:
+        """Releases the current (failed) variant and reserves the next one that fits."""
+        with self._lock:
+            current = self._allocations[component]
+            if current.index + 1 >= len(current.candidates):
+                return current.variant
+            why = f"{current.variant.name} failed: {reason}"
+            return self._pick(component, current.candidates, current.index + 1, why)
+
+    def record_external(self, component: str, name: str, reason: str) -> None:
+        """Notes a model served outside this process (e.g. by the inference sidecar)."""
+        with self._lock:
+            self._allocations.pop(component, None)
+            self._external[component] = {"variant": name, "footprint_mb": 0, "reason": reason, "decided_at": time.time()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            components: Dict[str, Any] = {
+                name: {
+                    "variant": a.variant.name,
+                    "footprint_mb": a.variant.footprint_mb,
+                    "reason": a.reason,
+                    "decided_at": a.decided_at,
+                }
+                for name, a in self._allocations.items()
+            }
+            components.update({name: dict(entry) for name, entry in self._external.items()})
+            used = self._used_mb()
+            return {
+                "budget_mb": self.budget_mb,
+                "allocated_mb": used,
+                "remaining_mb": self.budget_mb - used,
+                "components": components,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_model_budget() -> ModelBudget:
+    return ModelBudget(get_settings().MODEL_MEMORY_BUDGET_MB)
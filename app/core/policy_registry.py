@@ -0,0 +1,173 @@
+"""Single, hot-reloadable source of truth for ``policies.json``."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from app.core.config import get_settings
+from app.safety.threat_matcher import ThreatMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY_PATH = Path(__file__).resolve().parent / "policies.json"
+
+# Used when the file cannot be read before any good snapshot exists (Mini-Shield)
+FALLBACK_THREAT_PATTERNS = (r"(kill|suicide|die|hurt)", r"(hate|destroy)")
+FALLBACK_EMPATHY_TEMPLATES = {"joy": ("I am happy for you.",)}
+DEFAULT_TEMPLATE = "I am listening deeply."
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """
+    One immutable, fully compiled version of the policy file. Consumers read
+    the current snapshot once per request and use it without locking.
+    """
+
+    version: int
+    threat_patterns: Tuple[str, ...]
+    matcher: ThreatMatcher
+    empathy_templates: Mapping[str, Tuple[str, ...]]
+    source_mtime_ns: Optional[int]
+    loaded_at: float
+    fallback: bool = False
+
+    def templates_for(self, emotion: str) -> Tuple[str, ...]:
+        return self.empathy_templates.get(emotion, (DEFAULT_TEMPLATE,))
+
+
+def _compile(data: Dict[str, Any], version: int, mtime_ns: Optional[int], fallback: bool) -> PolicySnapshot:
+    patterns = tuple(str(p) for p in data.get("threat_patterns", []))
+    templates = {
+        str(emotion): tuple(str(t) for t in items)
+        for emotion, items in (data.get("empathy_templates") or {}).items()
+    }
+    return PolicySnapshot(
+        version=version,
+        threat_patterns=patterns,
+        matcher=ThreatMatcher(patterns),
+        empathy_templates=MappingProxyType(templates),
+        source_mtime_ns=mtime_ns,
+        loaded_at=time.time(),
+        fallback=fallback,
+    )
+
+
+class PolicyRegistry:
+    """
+    Parses ``policies.json`` once and hands out versioned ``PolicySnapshot``s.
+
+    ``snapshot()`` is the request path: it returns the current snapshot and, at
+    most once per ``check_interval_s``, stats the file. When the mtime or size
+    changed, one caller rebuilds a new snapshot off to the side and publishes
+    it with a single reference assignment (copy-on-write); other callers keep
+    using the previous snapshot meanwhile instead of waiting. A file that
+    fails to parse never replaces a good snapshot.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        check_interval_s: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        settings = get_settings()
+        self.path = Path(path or settings.POLICY_PATH or DEFAULT_POLICY_PATH)
+        self.check_interval_s = (
+            settings.POLICY_RELOAD_INTERVAL_SECONDS if check_interval_s is None else float(check_interval_s)
+        )
+        self._clock = clock
+        self._reload_lock = threading.Lock()
+        self._version = 0
+        self._file_key: Optional[Tuple[int, int]] = None
+        self._next_check = clock() + self.check_interval_s
+        self.reloads = 0
+        self.failures = 0
+        self._snapshot = self._load(initial=True)
+
+    def snapshot(self) -> PolicySnapshot:
+        if self._clock() >= self._next_check:
+            self._check_for_changes()
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def reload(self) -> PolicySnapshot:
+        """Re-reads the file unconditionally (e.g. from an admin hook or SIGHUP)."""
+        with self._reload_lock:
+            self._snapshot = self._load(initial=False)
+        return self._snapshot
+
+    def _check_for_changes(self) -> None:
+        # Only one thread polls; everyone else returns the current snapshot
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_check = self._clock() + self.check_interval_s
+            if self._stat_key() != self._file_key:
+                self._snapshot = self._load(initial=False)
+        finally:
+            self._reload_lock.release()
+
+    def _stat_key(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, initial: bool) -> PolicySnapshot:
+        file_key = self._stat_key()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError("policy file must contain a JSON object")
+            self._version += 1
+            snapshot = _compile(data, self._version, file_key[0] if file_key else None, fallback=False)
+        except Exception as e:
+            self.failures += 1
+            # Remember the broken file so it is not re-parsed on every check
+            self._file_key = file_key
+            if not initial:
+                logger.error(f"Failed to reload {self.path}; keeping policy v{self._snapshot.version}: {e}")
+                return self._snapshot
+            logger.error(f"Failed to load {self.path}: {e}")
+            self._version += 1
+            fallback = {"threat_patterns": FALLBACK_THREAT_PATTERNS, "empathy_templates": FALLBACK_EMPATHY_TEMPLATES}
+            return _compile(fallback, self._version, None, fallback=True)
+
+        self._file_key = file_key
+        if not initial:
+            self.reloads += 1
+            logger.info(f"Policies reloaded from {self.path} (v{snapshot.version}).")
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "path": str(self.path),
+            "version": snapshot.version,
+            "fallback": snapshot.fallback,
+            "threat_patterns": len(snapshot.threat_patterns),
+            "template_emotions": len(snapshot.empathy_templates),
+            "loaded_at": snapshot.loaded_at,
+            "reloads": self.reloads,
+            "failures": self.failures,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_policy_registry() -> PolicyRegistry:
+    """Process-wide registry shared by DivineShield, the mirror and the safety pipeline."""
+    return PolicyRegistry()
@@ -0,0 +1,22 @@
+"""Shared Unicode/Thai text normalisation."""
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r"\s+")
+# Zero-width characters that commonly leak into Thai text from copy/paste and IMEs
+_ZERO_WIDTH = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff"))
+# Thai spellings that render identically but differ in code points
+_THAI_FIXUPS = (
+    ("\u0e4d\u0e32", "\u0e33"),  # NIKHAHIT + SARA AA -> SARA AM
+    ("\u0e40\u0e40", "\u0e41"),  # SARA E + SARA E -> SARA AE
+)
+
+
+def normalize_unicode(text: str) -> str:
+    """NFKC, zero-width removal, Thai composite fix-ups, lowercase, collapsed whitespace."""
+    normalized = unicodedata.normalize("NFKC", text).translate(_ZERO_WIDTH)
+    for decomposed, composed in _THAI_FIXUPS:
+        normalized = normalized.replace(decomposed, composed)
+    return _WHITESPACE.sub(" ", normalized.lower()).strip()
@@ -0,0 +1,57 @@
+"""Content-hash keyed cache for per-text verdicts (safety assessments, emotion scores)."""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from app.core.config import get_settings
+from app.core.ttl_cache import TTLCache, content_hash
+
+V = TypeVar("V")
+
+
+class VerdictCache(Generic[V]):
+    """
+    Bounded TTL/LRU cache of deterministic per-text results.
+
+    Every entry is keyed by ``(tag, sha256(text))`` where the tag identifies
+    what produced the result -- the policy version for safety verdicts, the
+    analyzer for emotion scores. After a policy reload lookups use the new
+    version, so stale verdicts are never served and simply age out.
+
+    Cached values are shared; callers must hand out copies of mutable results.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        settings = get_settings()
+        self.name = name
+        self._cache: TTLCache[V] = TTLCache(
+            maxsize=settings.VERDICT_CACHE_SIZE if maxsize is None else maxsize,
+            ttl_seconds=settings.VERDICT_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds,
+            clock=clock,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.maxsize > 0
+
+    def lookup(self, text: str, tag: Hashable) -> Optional[V]:
+        if not self.enabled:
+            return None
+        return self._cache.get((tag, content_hash(text)))
+
+    def store(self, text: str, tag: Hashable, value: V) -> None:
+        if self.enabled:
+            self._cache.set((tag, content_hash(text)), value)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, **self._cache.stats()}
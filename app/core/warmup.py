@@ -0,0 +1,98 @@
+"""Background initialisation of heavy subsystems with per-component readiness."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass
+class _Component:
+    loader: Callable[[], Any]
+    on_ready: Callable[[Any], None]
+    state: str = PENDING
+    duration_s: Optional[float] = None
+    error: Optional[str] = None
+
+
+class WarmupManager:
+    """
+    Loads registered components off the request path.
+
+    Each component has a ``loader`` (the slow constructor) and an ``on_ready``
+    hook that publishes the result, typically by swapping it into the object
+    that serves requests. Until then callers keep using whatever degraded
+    stand-in is already in place. ``start`` loads every component on its own
+    daemon thread so slow ones (model weights, vector DB) overlap.
+    """
+
+    def __init__(self) -> None:
+        self._components: Dict[str, _Component] = {}
+        self._lock = threading.Lock()
+        self._threads: Dict[str, threading.Thread] = {}
+
+    def register(self, name: str, loader: Callable[[], Any], on_ready: Callable[[Any], None]) -> None:
+        with self._lock:
+            self._components[name] = _Component(loader=loader, on_ready=on_ready)
+
+    def start(self) -> None:
+        """Warms all pending components in background threads (idempotent)."""
+        with self._lock:
+            pending = [name for name, c in self._components.items() if c.state == PENDING]
+            for name in pending:
+                self._components[name].state = WARMING
+                thread = threading.Thread(target=self._warm, args=(name,), name=f"warmup-{name}", daemon=True)
+                self._threads[name] = thread
+                thread.start()
+
+    def warm_all(self) -> None:
+        """Warms pending components synchronously on the calling thread."""
+        with self._lock:
+            pending = [name for name, c in self._components.items() if c.state == PENDING]
+            for name in pending:
+                self._components[name].state = WARMING
+        for name in pending:
+            self._warm(name)
+
+    def _warm(self, name: str) -> None:
+        component = self._components[name]
+        start = time.perf_counter()
+        try:
+            component.on_ready(component.loader())
+        except Exception as e:
+            component.error = f"{type(e).__name__}: {e}"
+            component.state = FAILED
+            logger.error(f"Warm-up of {name} failed; staying in degraded mode: {e}")
+        else:
+            component.state = READY
+            logger.info(f"{name} warmed up in {time.perf_counter() - start:.2f}s.")
+        finally:
+            component.duration_s = round(time.perf_counter() - start, 3)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until background warm-up finished; True if nothing is still loading."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in list(self._threads.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            thread.join(remaining)
+        return not any(c.state in (PENDING, WARMING) for c in self._components.values())
+
+    def is_ready(self, name: Optional[str] = None) -> bool:
+        if name is not None:
+            return self._components[name].state == READY
+        return all(c.state == READY for c in self._components.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"state": c.state, "duration_s": c.duration_s, "error": c.error}
+            for name, c in self._components.items()
+        }
@@ -0,0 +1,137 @@
+"""Micro-batching scheduler that coalesces single-text inference calls."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets (the last bucket is open-ended).
+BATCH_SIZE_BUCKETS: Tuple[int, ...] = (1, 2, 4, 8, 16, 32, 64)
+
+
+class MicroBatcher:
+    """
+    Collects texts submitted from many callers and runs them through one batched call.
+
+    A dedicated worker thread waits for the first pending item, then keeps collecting
+    until either ``max_batch_size`` items are queued or ``max_wait_ms`` has elapsed,
+    and hands the whole batch to ``batch_fn``. Each caller receives a ``Future`` that
+    resolves to its own slice of the batched result.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[str]], Sequence[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ) -> None:
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self._pending: Deque[Tuple[str, Future]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self._batch_histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._batches = 0
+        self._items = 0
+        self._max_queue_depth = 0
+
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queues one text and returns a future for its result."""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            self._pending.append((text, future))
+            self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+            self._cond.notify()
+        return future
+
+    def __call__(self, text: str) -> Any:
+        """Blocking convenience wrapper around :meth:`submit`."""
+        return self.submit(text).result()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return []
+
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            size = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(size)]
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            self._record_batch(len(batch))
+            texts = [text for text, _ in batch]
+            try:
+                results = list(self.batch_fn(texts))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"batch_fn returned {len(results)} results for {len(batch)} inputs"
+                    )
+            except Exception as exc:
+                logger.error("%s batch of %d failed: %s", self.name, len(batch), exc)
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def _record_batch(self, size: int) -> None:
+        with self._cond:
+            self._batch_histogram[bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+            self._batches += 1
+            self._items += size
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns queue depth and batch-size histogram for throughput tuning."""
+        with self._cond:
+            labels = [f"<={bound}" for bound in BATCH_SIZE_BUCKETS]
+            labels.append(f">{BATCH_SIZE_BUCKETS[-1]}")
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self._max_queue_depth,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": round(self._items / self._batches, 3) if self._batches else 0.0,
+                "batch_size_histogram": dict(zip(labels, self._batch_histogram)),
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+            }
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Stops accepting work and lets the worker drain what is already queued."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
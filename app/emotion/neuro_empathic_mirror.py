@@ -1,22 +1,28 @@
 import hashlib
 import logging
 import os
-import psutil
-from importlib.util import find_spec
-from typing import Dict, List
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+from app.core.config import get_settings
+from app.core.lazy_import import lazy_import
+from app.core.model_budget import EMOTION_CLASSIFIER, ModelBudget, get_model_budget
+from app.core.policy_registry import PolicyRegistry, get_policy_registry
+from app.core.verdict_cache import VerdictCache
+from app.emotion.micro_batcher import MicroBatcher
+
 logger = logging.getLogger(__name__)
 
-HAS_TRANSFORMERS = find_spec("transformers") is not None
-if HAS_TRANSFORMERS:
-    try:
-        from transformers import pipeline
-    except Exception:
-        HAS_TRANSFORMERS = False
-        logger.warning(
-            "Transformers library detected but pipeline import failed. Running in simulation mode."
-        )
+# Imported on first model load, not when the module is imported
+transformers = lazy_import("transformers")
+HAS_TRANSFORMERS = transformers.available
+
+EMOTION_MODEL_ID = "bhadresh-savani/distilbert-base-uncased-emotion"
+
+def analyzer_variant(analyzer: Any) -> Any:
+    """Model variant behind ``analyzer``; a plain transformers pipeline is "pytorch"."""
+    return getattr(analyzer, "variant", None) or "pytorch"
+
 
 @dataclass
 class EmpathicResponse:
@@ -31,9 +37,23 @@ class NeuroEmpathicMirror:
     It acts as a mirror, reflecting the user's deep emotional state with empathy.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        policy_registry: Optional[PolicyRegistry] = None,
+        verdict_cache: Optional[VerdictCache[Dict[str, float]]] = None,
+        simulation: bool = False,
+        allow_remote: bool = True,
+        model_budget: Optional[ModelBudget] = None,
+    ):
+        self.simulation = simulation
+        # False inside the sidecar itself, which must load the model locally
+        self.allow_remote = allow_remote
+        self.budget = model_budget or get_model_budget()
+        self.policies = policy_registry or get_policy_registry()
+        # Model outputs for repeated texts; simulation mode is cheap enough to recompute
+        self.verdicts = verdict_cache or VerdictCache("emotion")
         self.analyzer = self._init_model()
-        self.empathy_templates = self._load_templates()
+        self.batcher = self._init_batcher()
         logger.info("Neuro-Empathic Mirror initialized.")
 
     def _init_model(self):
@@ -41,65 +61,179 @@ class NeuroEmpathicMirror:
         Initializes the Hugging Face emotion classification pipeline.
         Uses a DistilBERT model optimized for emotion detection.
         """
-        if not HAS_TRANSFORMERS:
-            logger.warning("Transformers library not found. Running in simulation mode.")
+        if self.simulation:
+            # Degraded stand-in served while the real model warms up
             return None
 
         if os.getenv("NAMO_EMOTION_SIM_MODE", "").lower() in {"1", "true", "yes"}:
             logger.warning("Emotion model load skipped via NAMO_EMOTION_SIM_MODE; running in simulation mode.")
             return None
 
-        # Avoid loading the model on constrained machines to prevent crashes.
-        if psutil.virtual_memory().available < 2_000_000_000:
-            logger.warning("Emotion model load skipped due to low available memory; running in simulation mode.")
+        settings = get_settings()
+        if self.allow_remote and settings.INFERENCE_SOCKET:
+            from app.inference.sidecar import RemoteEmotionAnalyzer, connect
+
+            # Multi-worker deployments share one model hosted by the sidecar
+            client = connect(settings.INFERENCE_SOCKET, "classify")
+            if client is not None:
+                analyzer = RemoteEmotionAnalyzer(client, variant=client.variants().get("classify", "pytorch"))
+                self.budget.record_external(
+                    EMOTION_CLASSIFIER, "sidecar", f"{analyzer.variant} served at {settings.INFERENCE_SOCKET}"
+                )
+                return analyzer
+
+        if not HAS_TRANSFORMERS:
+            logger.warning("Transformers library not found. Running in simulation mode.")
             return None
-        
+
+        # Load the preferred backend if it fits the model memory budget, else a
+        # smaller variant; simulation is the last resort, not the first fallback.
+        preference = ["onnx-int8", "pytorch"] if settings.EMOTION_BACKEND.lower() == "onnx" else ["pytorch", "onnx-int8"]
+        variant = self.budget.allocate(EMOTION_CLASSIFIER, preference)
+        while variant.name != "simulation":
+            analyzer = self._init_onnx_model() if variant.name == "onnx-int8" else self._init_pytorch_model()
+            if analyzer is not None:
+                return analyzer
+            variant = self.budget.fallback(EMOTION_CLASSIFIER, "load error")
+
+        logger.warning("No emotion model variant fits the model memory budget; running in simulation mode.")
+        return None
+
+    def _init_pytorch_model(self):
         try:
             # Using a robust, lightweight model for emotion detection
             # You can swap this with 'airesearch/wangchanberta...' for Thai-specific optimization
-            return pipeline(
+            return transformers.pipeline(
                 "text-classification", 
-                model="bhadresh-savani/distilbert-base-uncased-emotion", 
+                model=EMOTION_MODEL_ID,
                 top_k=None
             )
         except Exception as e:
             logger.error(f"Failed to load emotion model: {e}")
             return None
 
-    def _load_templates(self) -> Dict[str, List[str]]:
-        """Loads empathetic response templates from policies.json."""
+    def _init_onnx_model(self):
+        """Int8-quantized ONNX Runtime classifier; None if it cannot be loaded."""
+        from app.emotion.onnx_backend import HAS_ONNXRUNTIME, OnnxEmotionClassifier
+
+        if not HAS_ONNXRUNTIME:
+            logger.warning("onnxruntime not found; cannot load the ONNX emotion model.")
+            return None
+
+        settings = get_settings()
         try:
-            from pathlib import Path
-            import json
-            base_dir = Path(__file__).resolve().parent.parent # app/
-            policy_path = base_dir / "core" / "policies.json"
-            
-            with open(policy_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("empathy_templates", {})
+            return OnnxEmotionClassifier.from_pretrained(
+                settings.ONNX_MODEL_DIR,
+                model_id=EMOTION_MODEL_ID,
+                intra_op_threads=settings.ONNX_INTRA_OP_THREADS,
+            )
         except Exception as e:
-            logger.error(f"Failed to load policies.json: {e}")
-            return {"joy": ["I am happy for you."]}
+            logger.error(f"Failed to load ONNX emotion model: {e}")
+            return None
+
+    def _init_batcher(self):
+        """
+        Puts a micro-batching scheduler in front of the pipeline so concurrent
+        single-text calls share one batched forward pass.
+        """
+        if self.analyzer is None:
+            return None
+
+        settings = get_settings()
+        if settings.EMOTION_BATCH_MAX_SIZE <= 1:
+            return None
+
+        return MicroBatcher(
+            self._run_pipeline,
+            max_batch_size=settings.EMOTION_BATCH_MAX_SIZE,
+            max_wait_ms=settings.EMOTION_BATCH_WINDOW_MS,
+            name="emotion-batcher",
+        )
+
+    def _run_pipeline(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """Runs one batched forward pass; returns per-text label/score lists."""
+        return self.analyzer(texts, batch_size=len(texts))
+
+    def batcher_stats(self) -> Dict[str, Any]:
+        """Queue depth and batch-size histogram of the inference scheduler."""
+        if self.batcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.batcher.stats()}
+
+    @property
+    def _model_tag(self) -> Tuple[str, Any]:
+        # Cached outputs are keyed by the analyzer variant, so switching backends
+        # (pytorch, onnx-int8, sidecar) never serves another model's scores.
+        # Emotion scores do not depend on the policy file.
+        return ("model", analyzer_variant(self.analyzer))
+
+    @property
+    def empathy_templates(self) -> Mapping[str, Tuple[str, ...]]:
+        """Templates of the current policy snapshot, indexed by emotion."""
+        return self.policies.snapshot().empathy_templates
 
     def analyze_emotion_depth(self, text: str) -> Dict[str, float]:
         """
         Analyzes text to extract a 5-dimensional emotional vector.
         Returns a dictionary of {emotion: score}.
         """
-        # Default neutral state
-        default_state = {'joy': 0.1, 'sadness': 0.1, 'anger': 0.1, 'fear': 0.1, 'love': 0.1}
-        
         if self.analyzer:
+            cached = self.verdicts.lookup(text, self._model_tag)
+            if cached is not None:
+                return dict(cached)
             try:
-                results = self.analyzer(text)[0]
-                # Normalize scores to dictionary format
-                scores = {item['label']: item['score'] for item in results}
-                return {**default_state, **scores}
+                if self.batcher is not None:
+                    results = self.batcher(text)
+                else:
+                    results = self.analyzer(text)[0]
+                state = self._to_emotion_state(results)
+                self.verdicts.store(text, self._model_tag, state)
+                return dict(state)
             except Exception as e:
                 logger.error(f"Analysis failed: {e}")
-                pass
-        
+
         # Fallback simulation logic (Keyword based) if model fails
+        return self._simulate_emotion(text)
+
+    def analyze_emotion_depth_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Analyzes many texts with a single batched forward pass (cache misses only)."""
+        if not texts:
+            return []
+
+        if self.analyzer:
+            tag = self._model_tag
+            states: List[Optional[Dict[str, float]]] = [self.verdicts.lookup(text, tag) for text in texts]
+            # Each distinct uncached text goes through the model once
+            misses: Dict[str, List[int]] = {}
+            for i, state in enumerate(states):
+                if state is None:
+                    misses.setdefault(texts[i], []).append(i)
+            try:
+                if misses:
+                    outputs = self._run_pipeline(list(misses))
+                    for text, results in zip(misses, outputs):
+                        state = self._to_emotion_state(results)
+                        self.verdicts.store(text, tag, state)
+                        for i in misses[text]:
+                            states[i] = state
+                return [dict(state) for state in states]
+            except Exception as e:
+                logger.error(f"Batch analysis failed: {e}")
+
+        return [self._simulate_emotion(text) for text in texts]
+
+    @staticmethod
+    def _default_state() -> Dict[str, float]:
+        # Default neutral state
+        return {'joy': 0.1, 'sadness': 0.1, 'anger': 0.1, 'fear': 0.1, 'love': 0.1}
+
+    def _to_emotion_state(self, results: List[Dict[str, Any]]) -> Dict[str, float]:
+        # Normalize scores to dictionary format
+        scores = {item['label']: item['score'] for item in results}
+        return {**self._default_state(), **scores}
+
+    def _simulate_emotion(self, text: str) -> Dict[str, float]:
+        default_state = self._default_state()
         text_lower = text.lower()
         if 'happy' in text_lower or 'good' in text_lower:
             default_state['joy'] = 0.8
@@ -111,10 +245,10 @@ class NeuroEmpathicMirror:
             default_state['fear'] = 0.8
         if 'love' in text_lower or 'loved' in text_lower or 'caring' in text_lower:
             default_state['love'] = 0.8
-        
+
         return default_state
 
-    def _select_template(self, templates: List[str], user_text: str) -> str:
+    def _select_template(self, templates: Sequence[str], user_text: str) -> str:
         """Selects a deterministic template based on user input to avoid randomness."""
         if not templates:
             return "I am listening deeply."
@@ -127,14 +261,20 @@ class NeuroEmpathicMirror:
         """
         Main processing loop: Analyzes input and generates a mirrored response.
         """
-        emotions = self.analyze_emotion_depth(user_text)
-        
+        return self._respond(user_text, self.analyze_emotion_depth(user_text))
+
+    def reflect_batch(self, user_texts: List[str]) -> List[EmpathicResponse]:
+        """Same as ``reflect`` for many texts, with one batched emotion inference call."""
+        emotions = self.analyze_emotion_depth_batch(user_texts)
+        return [self._respond(text, state) for text, state in zip(user_texts, emotions)]
+
+    def _respond(self, user_text: str, emotions: Dict[str, float]) -> EmpathicResponse:
         # Identify dominant emotion
         primary_emotion = max(emotions, key=emotions.get)
         intensity = emotions[primary_emotion]
         
         # Select appropriate response template
-        templates = self.empathy_templates.get(primary_emotion, ["I am listening deeply."])
+        templates = self.policies.snapshot().templates_for(primary_emotion)
         selected_response = self._select_template(templates, user_text)
         
         # Determine support level based on intensity
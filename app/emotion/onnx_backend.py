@@ -0,0 +1,170 @@
+"""ONNX Runtime backend for the emotion classifier (dynamic int8 quantization).
+
+Export once (e.g. at image build time):
+
+    python -m app.emotion.onnx_backend --output models/emotion-onnx-int8
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from app.core.lazy_import import lazy_import
+
+logger = logging.getLogger(__name__)
+
+onnxruntime = lazy_import("onnxruntime")
+torch = lazy_import("torch")
+transformers = lazy_import("transformers")
+HAS_ONNXRUNTIME = onnxruntime.available
+
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+# Written by save_pretrained; without them the exported model cannot be loaded
+REQUIRED_FILES = ("config.json", "tokenizer_config.json")
+
+
+def is_complete_export(model_dir: Union[str, Path]) -> bool:
+    """True when ``model_dir`` holds the int8 model plus its tokenizer and config."""
+    model_dir = Path(model_dir)
+    return all((model_dir / name).exists() for name in (INT8_FILENAME, *REQUIRED_FILES))
+
+
+def export_quantized(model_id: str, output_dir: Union[str, Path], opset: int = 17) -> Path:
+    """
+    Exports ``model_id`` to ONNX with dynamic batch/sequence axes, then applies
+    dynamic int8 weight quantization. The tokenizer and config are saved next
+    to the model so loading needs neither the Hub nor PyTorch. Returns the
+    path of the quantized model (re-used if a complete export already exists).
+
+    Everything is written to a temporary sibling directory that is renamed
+    into place at the end, so an interrupted export never leaves a directory
+    that looks done but cannot be loaded; an incomplete one is rebuilt.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_dir = Path(output_dir)
+    int8_path = output_dir / INT8_FILENAME
+    if is_complete_export(output_dir):
+        return int8_path
+
+    output_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{output_dir.name}-", dir=output_dir.parent))
+    try:
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_id)
+        model = transformers.AutoModelForSequenceClassification.from_pretrained(model_id)
+        model.eval()
+
+        sample = tokenizer(["export sample"], return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask") if name in sample]
+        fp32_path = staging / FP32_FILENAME
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in input_names}, "logits": {0: "batch"}},
+                opset_version=opset,
+            )
+        quantize_dynamic(str(fp32_path), str(staging / INT8_FILENAME), weight_type=QuantType.QInt8)
+        tokenizer.save_pretrained(staging)
+        model.config.save_pretrained(staging)
+
+        if output_dir.exists():
+            if is_complete_export(output_dir):  # another process finished first
+                return int8_path
+            shutil.rmtree(output_dir)  # left behind by an interrupted older export
+        os.replace(staging, output_dir)
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+    logger.info("Exported %s to %s (int8).", model_id, int8_path)
+    return int8_path
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(shifted)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class OnnxEmotionClassifier:
+    """
+    Drop-in replacement for ``pipeline("text-classification", top_k=None)``.
+
+    Called with a list it returns one ``[{label, score}, ...]`` list per text,
+    sorted by score; a single string yields a one-element list of those, which
+    is what ``NeuroEmpathicMirror`` indexes with ``[0]``.
+    """
+
+    variant = "onnx-int8"
+
+    def __init__(
+        self, session: Any, tokenizer: Any, id2label: Mapping[int, str], max_length: Optional[int] = None
+    ) -> None:
+        self.session = session
+        self.tokenizer = tokenizer
+        self.id2label = {int(k): v for k, v in id2label.items()}
+        # Truncate where the PyTorch pipeline does (the model limit), not earlier
+        self.max_length = max_length if max_length is not None else getattr(tokenizer, "model_max_length", None)
+        self.input_names = [node.name for node in session.get_inputs()]
+
+    @classmethod
+    def from_pretrained(
+        cls,
+        model_dir: Union[str, Path],
+        model_id: str,
+        intra_op_threads: int = 0,
+        max_length: Optional[int] = None,
+    ) -> "OnnxEmotionClassifier":
+        """Loads (exporting on first use) the quantized model from ``model_dir``."""
+        model_path = export_quantized(model_id, model_dir)
+        options = onnxruntime.SessionOptions()
+        # 0 lets onnxruntime pick one thread per physical core
+        options.intra_op_num_threads = max(0, int(intra_op_threads))
+        options.inter_op_num_threads = 1
+        options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = onnxruntime.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_dir)
+        config = transformers.AutoConfig.from_pretrained(model_dir)
+        return cls(session, tokenizer, config.id2label, max_length=max_length)
+
+    def __call__(self, texts: Union[str, Sequence[str]], **_: Any) -> List[List[Dict[str, Any]]]:
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        if not batch:
+            return []
+        encoded = self.tokenizer(
+            batch, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        feeds = {name: np.asarray(encoded[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        probabilities = _softmax(np.asarray(logits, dtype=np.float64))
+        results = []
+        for row in probabilities:
+            order = np.argsort(-row, kind="stable")
+            results.append([{"label": self.id2label[int(i)], "score": float(row[i])} for i in order])
+        return results
+
+
+def main() -> None:
+    from app.emotion.neuro_empathic_mirror import EMOTION_MODEL_ID
+
+    parser = argparse.ArgumentParser(description="Export the emotion model to quantized ONNX.")
+    parser.add_argument("--model", default=EMOTION_MODEL_ID)
+    parser.add_argument("--output", default="models/emotion-onnx-int8")
+    args = parser.parse_args()
+    print(export_quantized(args.model, args.output))
+
+
+if __name__ == "__main__":
+    main()
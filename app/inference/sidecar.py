@@ -0,0 +1,330 @@
+"""Local inference sidecar: one process hosts the models for every uvicorn worker.
+
+Run next to the API workers and point them at it with NAMO_INFERENCE_SOCKET:
+
+    python -m app.inference.sidecar --socket /tmp/namo-inference.sock
+
+Wire format over the Unix domain socket: each message is a 4-byte big-endian
+length followed by a UTF-8 JSON object. Requests are
+``{"op": "classify" | "embed" | "ping" | "stats", "texts": [...]}`` and
+responses ``{"ok": true, "result": ...}`` or ``{"ok": false, "error": "..."}``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.emotion.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+# The server gives up on a model call first, so the client reads its timeout
+# reply instead of hitting its own socket timeout
+DEFAULT_REQUEST_TIMEOUT_S = 10.0
+DEFAULT_TIMEOUT_S = DEFAULT_REQUEST_TIMEOUT_S + 2.0
+
+BatchFn = Callable[[List[str]], Sequence[Any]]
+
+
+class SidecarError(RuntimeError):
+    """The sidecar answered with an error or could not be reached."""
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            if chunks:
+                raise ConnectionError("connection closed mid-frame")
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Reads one message; None when the peer closed the connection cleanly."""
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_FRAME_BYTES:
+        raise ConnectionError(f"frame of {size} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    body = _recv_exact(sock, size)
+    if body is None:
+        raise ConnectionError("connection closed mid-frame")
+    return json.loads(body.decode("utf-8"))
+
+
+def write_frame(sock: socket.socket, message: Dict[str, Any]) -> None:
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(body)) + body)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        owner: InferenceServer = self.server.owner  # type: ignore[attr-defined]
+        while True:
+            try:
+                request = read_frame(self.request)
+            except (ConnectionError, ValueError) as exc:
+                logger.warning("Dropping sidecar connection: %s", exc)
+                return
+            if request is None:
+                return
+            try:
+                write_frame(self.request, owner.dispatch(request))
+            except OSError:
+                # The worker went away mid-request; nothing left to answer
+                return
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Every worker thread holds its own connection; the default backlog of 5
+    # makes bursts of connects fail with EAGAIN
+    request_queue_size = 128
+
+
+class InferenceServer:
+    """
+    Serves batched model calls to every worker process on the host.
+
+    Each operation has its own ``MicroBatcher``, so texts arriving from
+    different workers within the batching window share one forward pass.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        handlers: Dict[str, BatchFn],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        variants: Optional[Dict[str, str]] = None,
+        request_timeout_s: float = DEFAULT_REQUEST_TIMEOUT_S,
+    ) -> None:
+        self.socket_path = socket_path
+        # A hung model call fails the request instead of pinning the handler thread
+        self.request_timeout_s = request_timeout_s
+        # Model variant behind each op (e.g. {"embed": "minilm"}), reported by ping
+        self.variants = dict(variants or {})
+        self.batchers = {
+            op: MicroBatcher(fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, name=f"sidecar-{op}")
+            for op, fn in handlers.items()
+        }
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # stale socket from a previous run
+        self._server = _UnixServer(socket_path, _Handler)
+        self._server.owner = self  # type: ignore[attr-defined]
+        self._thread: Optional[threading.Thread] = None
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        try:
+            if op == "ping":
+                return {"ok": True, "result": {"ops": sorted(self.batchers), "variants": self.variants}}
+            if op == "stats":
+                return {"ok": True, "result": self.stats()}
+            batcher = self.batchers.get(op)
+            if batcher is None:
+                return {"ok": False, "error": f"unsupported op: {op!r}"}
+            futures = [batcher.submit(str(text)) for text in request.get("texts", [])]
+            deadline = time.monotonic() + self.request_timeout_s
+            return {
+                "ok": True,
+                "result": [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures],
+            }
+        except FutureTimeoutError:
+            return {"ok": False, "error": f"{op} timed out after {self.request_timeout_s:g}s"}
+        except Exception as exc:
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+    def serve_forever(self) -> None:
+        logger.info("Inference sidecar listening on %s (ops: %s)", self.socket_path, ", ".join(sorted(self.batchers)))
+        self._server.serve_forever()
+
+    def start(self) -> "InferenceServer":
+        """Serves from a background thread (tests, single-process embedding)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="inference-sidecar", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        for batcher in self.batchers.values():
+            batcher.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def stats(self) -> Dict[str, Any]:
+        return {op: batcher.stats() for op, batcher in self.batchers.items()}
+
+
+class SidecarClient:
+    """
+    Blocking client with one persistent connection per calling thread.
+
+    A call that fails to connect, or whose connection was reset or closed,
+    is retried once on a fresh connection, which covers a sidecar restart
+    between requests. A timed-out call is not retried: the sidecar may still
+    be working on it, and resubmitting would only queue behind the hang.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = DEFAULT_TIMEOUT_S) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _reset(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    def call(self, op: str, texts: Sequence[str] = ()) -> Any:
+        request = {"op": op, "texts": list(texts)}
+        for attempt in (1, 2):
+            try:
+                sock = self._connection()
+                write_frame(sock, request)
+                response = read_frame(sock)
+                if response is None:
+                    raise ConnectionError("sidecar closed the connection")
+            except (ConnectionError, FileNotFoundError) as exc:
+                self._reset()
+                if attempt == 2:
+                    raise SidecarError(f"inference sidecar at {self.socket_path} unreachable: {exc}") from exc
+                continue
+            except (OSError, ValueError) as exc:
+                # Includes socket.timeout; the late reply would desync the connection, so drop it
+                self._reset()
+                raise SidecarError(f"inference sidecar at {self.socket_path} failed: {exc}") from exc
+            if not response.get("ok"):
+                raise SidecarError(response.get("error", "unknown sidecar error"))
+            return response.get("result")
+
+    def ops(self) -> List[str]:
+        """Operations the sidecar serves; empty if it cannot be reached."""
+        try:
+            return list(self.call("ping").get("ops", []))
+        except SidecarError:
+            return []
+
+    def variants(self) -> Dict[str, str]:
+        """Model variant per operation as reported by the sidecar; empty if unknown."""
+        try:
+            return dict(self.call("ping").get("variants", {}))
+        except SidecarError:
+            return {}
+
+    def close(self) -> None:
+        self._reset()
+
+
+def connect(socket_path: Optional[str], op: str) -> Optional[SidecarClient]:
+    """Client for ``socket_path`` if the sidecar is up and serves ``op``, else None."""
+    if not socket_path:
+        return None
+    client = SidecarClient(socket_path)
+    if op in client.ops():
+        return client
+    client.close()
+    logger.warning("Inference sidecar at %s does not serve %r; loading it in-process.", socket_path, op)
+    return None
+
+
+class RemoteEmotionAnalyzer:
+    """Sidecar-backed stand-in for the ``text-classification`` pipeline used by NeuroEmpathicMirror."""
+
+    def __init__(self, client: SidecarClient, variant: str = "pytorch") -> None:
+        self.client = client
+        # Model variant the sidecar runs; part of the emotion cache tag
+        self.variant = variant
+
+    def __call__(self, texts: Union[str, Sequence[str]], **_: Any) -> List[List[Dict[str, Any]]]:
+        batch = [texts] if isinstance(texts, str) else list(texts)
+        return self.client.call("classify", batch) if batch else []
+
+
+class RemoteEmbedder:
+    """Sidecar-backed stand-in for ``SentenceTransformer.encode``."""
+
+    name = "sidecar"
+
+    def __init__(self, client: SidecarClient, variant: str = "minilm") -> None:
+        self.client = client
+        # Embedding space of the sidecar's model; decides the memory collection
+        self.variant = variant
+
+    def encode(self, sentences: Union[str, Sequence[str]], **_: Any) -> np.ndarray:
+        if isinstance(sentences, str):
+            return np.asarray(self.client.call("embed", [sentences])[0], dtype=np.float32)
+        return np.asarray(self.client.call("embed", list(sentences)), dtype=np.float32)
+
+
+def main() -> None:
+    from app.core.config import get_settings
+    from app.emotion.neuro_empathic_mirror import NeuroEmpathicMirror, analyzer_variant
+    from app.memory.infinity_memory import embedder_variant, load_local_embedder
+
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Host the emotion and embedding models for all workers.")
+    parser.add_argument("--socket", default=settings.INFERENCE_SOCKET or "/tmp/namo-inference.sock")
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=settings.EMOTION_BATCH_WINDOW_MS)
+    args = parser.parse_args()
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
+    handlers: Dict[str, BatchFn] = {}
+    mirror = NeuroEmpathicMirror(allow_remote=False)
+    if mirror.batcher is not None:
+        mirror.batcher.close()  # the server batches across workers instead
+    variant = None
+    if mirror.analyzer is not None:
+        analyzer = mirror.analyzer
+        variant = analyzer_variant(analyzer)
+        handlers["classify"] = lambda texts: analyzer(texts, batch_size=len(texts))
+    embedder = load_local_embedder(settings)
+    handlers["embed"] = lambda texts: np.asarray(embedder.encode(texts), dtype=np.float32).tolist()
+
+    server = InferenceServer(
+        args.socket,
+        handlers,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        variants={"embed": embedder_variant(embedder), **({"classify": variant} if variant else {})},
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Deterministic, dependency-free text embedder based on hashed character n-grams."""
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.core.text_normalization import normalize_unicode
+
+_MULTIPLIER = np.uint64(0x100000001B3)  # FNV 64-bit prime
+_MIX_1 = np.uint64(0xFF51AFD7ED558CCD)  # murmur3 fmix64 constants
+_MIX_2 = np.uint64(0xC4CEB9FE1A85EC53)
+
+
+def normalize_for_embedding(text: str) -> str:
+    """Shared normalisation, padded so word edges form their own n-grams."""
+    return f" {normalize_unicode(text)} "
+
+
+def _fmix64(h: np.ndarray) -> np.ndarray:
+    h ^= h >> np.uint64(33)
+    h *= _MIX_1
+    h ^= h >> np.uint64(33)
+    h *= _MIX_2
+    h ^= h >> np.uint64(33)
+    return h
+
+
+class HashingEmbedder:
+    """
+    Feature-hashes character n-grams into a fixed-width float32 vector.
+
+    Character n-grams need no tokenizer, so Thai (written without spaces) is
+    handled the same way as space-delimited languages. Each n-gram lands in one
+    of ``dim`` buckets with a +/-1 sign; rows are L2-normalised so dot products
+    are cosine similarities. Output depends only on the input text, which makes
+    retrieval reproducible across runs, machines and processes.
+
+    ``encode`` mirrors ``SentenceTransformer.encode``: a string yields a 1-D
+    vector and a list yields a 2-D array, computed for the whole batch at once.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 384, ngram_range: Tuple[int, int] = (1, 4)) -> None:
+        self.dim = int(dim)
+        self.ngram_range = ngram_range
+
+    def encode(self, sentences: Union[str, Sequence[str]], **_: object) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self._encode_batch([sentences])[0]
+        return self._encode_batch(list(sentences))
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return out
+
+        padded = [normalize_for_embedding(text) for text in texts]
+        codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        rows = np.repeat(np.arange(len(texts)), [len(text) for text in padded])
+
+        n_min, n_max = self.ngram_range
+        for n in range(n_min, n_max + 1):
+            count = len(codes) - n + 1
+            if count <= 0:
+                break
+            # Only n-grams that start and end inside the same text
+            valid = rows[:count] == rows[n - 1 : n - 1 + count]
+            hashes = np.full(count, np.uint64(n), dtype=np.uint64)
+            for offset in range(n):
+                hashes = hashes * _MULTIPLIER ^ codes[offset : offset + count]
+            hashes = _fmix64(hashes)[valid]
+
+            buckets = (hashes % np.uint64(self.dim)).astype(np.intp)
+            signs = np.where(hashes >> np.uint64(63), 1.0, -1.0).astype(np.float32)
+            np.add.at(out, (rows[:count][valid], buckets), signs)
+
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
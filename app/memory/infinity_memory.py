@@ -1,34 +1,83 @@
 import json
 import logging
+import threading
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
 import os
 import numpy as np
 from app.core.config import get_settings
+from app.core.lazy_import import lazy_import
+from app.core.metrics import CHROMA_ADD_SPAN, CHROMA_QUERY_SPAN, span
+from app.core.model_budget import EMBEDDER, ModelBudget, get_model_budget
+from app.core.ttl_cache import TTLCache, content_hash
+from app.memory.hashing_embedder import HashingEmbedder
+from app.memory.memory_ids import MemoryIdAssigner, MemoryIdGenerator
+from app.memory.reranker import cosine_similarities, epoch_us, metadata_of, rerank
+from app.memory.short_term_tier import LocalHotStore, ShortTermTier
+from app.memory.write_behind import WriteBehindBuffer
 
 # ตรวจสอบ Library (ถ้ายังไม่ลง จะรันแบบ Simulation ให้ก่อนกัน Error)
-try:
-    import chromadb
-    HAS_CHROMA = True
-except ImportError:
-    HAS_CHROMA = False
-
-try:
-    from sentence_transformers import SentenceTransformer
-    HAS_SENTENCE_TRANSFORMERS = True
-except ImportError:
-    HAS_SENTENCE_TRANSFORMERS = False
-
-try:
-    import redis
-    HAS_REDIS = True
-except ImportError:
-    HAS_REDIS = False
+# Heavy clients are imported on first use so importing this module stays cheap
+chromadb = lazy_import("chromadb")
+sentence_transformers = lazy_import("sentence_transformers")
+redis = lazy_import("redis")
+HAS_CHROMA = chromadb.available
+HAS_SENTENCE_TRANSFORMERS = sentence_transformers.available
+HAS_REDIS = redis.available
 
 logger = logging.getLogger(__name__)
 
+def load_local_embedder(settings, budget: Optional[ModelBudget] = None):
+    """
+    In-process embedder: MiniLM when installed and within the model memory
+    budget, else the deterministic hashing embedder.
+    """
+    budget = budget or get_model_budget()
+    if settings.EMBEDDER_BACKEND.lower() == "hashing":
+        budget.allocate(EMBEDDER, ["hashing"])
+        return HashingEmbedder(dim=settings.EMBEDDING_DIM)
+
+    if budget.allocate(EMBEDDER).name == "minilm":
+        if HAS_SENTENCE_TRANSFORMERS:
+            try:
+                return sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2")
+            except Exception as exc:
+                logger.warning("Memory embedder init error: %s", exc)
+                budget.fallback(EMBEDDER, "load error")
+        else:
+            budget.fallback(EMBEDDER, "sentence_transformers not installed")
+
+    # Offline / CI nodes still get deterministic, meaningful retrieval
+    logger.info("Using deterministic hashing embedder for memory vectors.")
+    return HashingEmbedder(dim=settings.EMBEDDING_DIM)
+
+
+# Vectors from different embedders are not comparable, so each variant gets its
+# own collection. MiniLM keeps the original name, which holds the existing data.
+_COLLECTION = "namo_infinity_memories"
+
+
+def embedder_variant(embedder: Any) -> str:
+    """Embedding space of ``embedder``: "minilm", "hashing", or what the sidecar serves."""
+    if isinstance(embedder, HashingEmbedder):
+        return "hashing"
+    return getattr(embedder, "variant", None) or "minilm"
+
+
+def collection_name(variant: str) -> str:
+    return _COLLECTION if variant == "minilm" else f"{_COLLECTION}_{variant}"
+
+
+def hot_tier_prefix(variant: str) -> str:
+    return "namo:stm:" if variant == "minilm" else f"namo:stm:{variant}:"
+
+
+class FallbackVector(list):
+    """Hashing vector used in place of a failed encoder call; never cached or persisted."""
+
+
 @dataclass
 class MemoryRecord:
     """โครงสร้างข้อมูลความจำ"""
@@ -47,9 +96,32 @@ class InfinityMemorySystem:
         self.settings = get_settings()
         self.phi = self.settings.PHI
         self.db_path = db_path
+        # Chosen first: the vector space decides which collection / hot-tier keys are used
+        self.embedder = self._init_embedder()
+        self.embedder_variant = embedder_variant(self.embedder)
+        self.collection_name = collection_name(self.embedder_variant)
         self.vector_db = self._init_vector_db()
+        self.id_assigner = MemoryIdAssigner(
+            MemoryIdGenerator(self.settings.NODE_ID),
+            window_seconds=self.settings.MEMORY_DEDUP_WINDOW_SECONDS,
+        )
+        self.write_buffer = self._init_write_buffer()
         self.redis_client = self._init_redis()
-        self.embedder = self._init_embedder()
+        # Hot tier: recent per-user turns answered without a Chroma round trip
+        self.hot_tier = ShortTermTier(
+            self.redis_client,
+            ttl_seconds=self.settings.HOT_TIER_TTL_SECONDS,
+            max_turns=self.settings.HOT_TIER_MAX_TURNS,
+            key_prefix=hot_tier_prefix(self.embedder_variant),
+        )
+        self.fallback_embedder = HashingEmbedder(dim=self.settings.EMBEDDING_DIM)
+        self.skipped_fallback_writes = 0
+        self._stats_lock = threading.Lock()
+        # Cache embeddings by content hash so repeated texts skip the encoder
+        self.embedding_cache: TTLCache[List[float]] = TTLCache(
+            maxsize=self.settings.EMBEDDING_CACHE_SIZE,
+            ttl_seconds=self.settings.EMBEDDING_CACHE_TTL_SECONDS,
+        )
         # น้ำหนักความสำคัญของอารมณ์ (จำเรื่องสะเทือนใจได้แม่นกว่า)
         self.emotional_weights = {
             'joy': 0.8, 'sadness': 0.7, 'anger': 0.6,
@@ -79,110 +151,366 @@ class InfinityMemorySystem:
                 logger.info("Initialized local Chroma persistent client at %s", self.db_path)
 
             return client.get_or_create_collection(
-                name="namo_infinity_memories",
-                metadata={"description": "Namo's infinite memory storage"}
+                name=self.collection_name,
+                metadata={"description": "Namo's infinite memory storage", "embedder": self.embedder_variant}
             )
         except Exception as e:
             logger.error(f"Failed to initialize ChromaDB: {e}")
             return None
 
+    def _init_write_buffer(self):
+        if not self.vector_db or not self.settings.MEMORY_WRITE_BEHIND:
+            return None
+        return WriteBehindBuffer(
+            self._bulk_upsert,
+            max_batch_size=self.settings.MEMORY_FLUSH_BATCH_SIZE,
+            flush_interval_ms=self.settings.MEMORY_FLUSH_INTERVAL_MS,
+            max_queue_size=self.settings.MEMORY_WRITE_QUEUE_SIZE,
+            overflow_policy=self.settings.MEMORY_WRITE_OVERFLOW_POLICY,
+            block_timeout=self.settings.MEMORY_WRITE_BLOCK_TIMEOUT_S,
+        )
+
+    def storage_info(self) -> Dict[str, Any]:
+        """Embedder variant and the collection its vectors are stored in."""
+        return {
+            "embedder": self.embedder_variant,
+            "collection": self.collection_name,
+            "vector_db": self.vector_db is not None,
+        }
+
+    def write_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            skipped = {"skipped_fallback_writes": self.skipped_fallback_writes}
+        if self.write_buffer is None:
+            return {"enabled": False, **skipped}
+        return {"enabled": True, **self.write_buffer.stats(), **skipped}
+
     def _init_redis(self):
         if not HAS_REDIS:
-            return None
+            logger.info("Redis library not found. Using in-process short-term memory.")
+            return LocalHotStore()
         try:
             # เชื่อมต่อ Redis (ถ้ามี) เพื่อ Cache ความจำระยะสั้น
-            return redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+            client = redis.Redis.from_url(
+                self.settings.REDIS_URL, decode_responses=True, socket_connect_timeout=0.5
+            )
+            client.ping()
+            return client
         except Exception as exc:
-            logger.warning(f"Failed to connect to Redis: {exc}")
-            return None
+            logger.warning(f"Failed to connect to Redis: {exc}. Using in-process short-term memory.")
+            return LocalHotStore()
 
     def _init_embedder(self):
-        if not HAS_SENTENCE_TRANSFORMERS:
-            return None
+        if self.settings.EMBEDDER_BACKEND.lower() != "hashing" and self.settings.INFERENCE_SOCKET:
+            from app.inference.sidecar import RemoteEmbedder, connect
+
+            # Multi-worker deployments share one MiniLM hosted by the sidecar
+            client = connect(self.settings.INFERENCE_SOCKET, "embed")
+            if client is not None:
+                embedder = RemoteEmbedder(client, variant=client.variants().get("embed", "minilm"))
+                get_model_budget().record_external(
+                    EMBEDDER, "sidecar", f"{embedder.variant} served at {self.settings.INFERENCE_SOCKET}"
+                )
+                return embedder
+        return load_local_embedder(self.settings)
+
+    def _encode(self, sentences):
+        """
+        Encodes with the chosen embedder. Returns ``(vectors, fallback)``; on an
+        encoder error the hashing embedder stands in and ``fallback`` is True.
+        """
+        if not self.embedder:
+            return self.fallback_embedder.encode(sentences), False
         try:
-            return SentenceTransformer("all-MiniLM-L6-v2")
+            return np.asarray(self.embedder.encode(sentences)), False
         except Exception as exc:
-            logger.warning("Memory embedder init error: %s", exc)
-            return None
+            logger.warning("Memory embed error, using hashing embedder for this call: %s", exc)
+            return self.fallback_embedder.encode(sentences), True
 
-    def _embed_text(self, text: str) -> List[float]:
-        if self.embedder:
-            try:
-                embedding = self.embedder.encode(text)
-                return embedding.tolist()
-            except Exception as exc:
-                print(f"⚠️ [Memory] Embed Error: {exc}")
-        return np.random.rand(384).tolist()
+    def embed(self, text: str) -> List[float]:
+        """
+        Returns the embedding for ``text``, reusing a cached vector when possible.
+        Callers embed once per turn and pass the vector to store/retrieve.
+        A stand-in vector from a failed encoder call is returned as a
+        ``FallbackVector`` and never cached.
+        """
+        key = content_hash(text)
+        cached = self.embedding_cache.get(key)
+        if cached is not None:
+            return cached
 
-    def _calculate_temporal_relevance(self, memory_timestamp: str) -> float:
-        """คำนวณน้ำหนักความเกี่ยวข้องตามเวลาโดยใช้ค่า Phi."""
-        try:
-            mem_time = datetime.fromisoformat(memory_timestamp)
-            hours_passed = (datetime.now() - mem_time).total_seconds() / 3600
-            decay_factor = self.phi ** (hours_passed / 24.0)
-            return 1.0 / decay_factor
-        except Exception:
-            return 1.0
-
-    def store_memory(self, text: str, emotion: Dict[str, float]) -> str:
-        """บันทึกความจำใหม่"""
-        timestamp = datetime.now().isoformat()
+        vector, fallback = self._encode(text)
+        if fallback:
+            return FallbackVector(vector.tolist())
+        embedding = vector.tolist()
+        self.embedding_cache.set(key, embedding)
+        return embedding
+
+    def _persistable(self, text: str, embedding: Sequence[float]) -> Optional[List[float]]:
+        """
+        Vector to store for ``text``: fallback vectors are re-encoded with the
+        chosen embedder, and None (skip the write) if that fails again, so the
+        collection only ever holds vectors from one embedding space.
+        """
+        if not isinstance(embedding, FallbackVector):
+            return list(embedding)
+        vector, fallback = self._encode(text)
+        if not fallback:
+            return vector.tolist()
+        with self._stats_lock:
+            self.skipped_fallback_writes += 1
+        logger.error("Skipping memory write: embedder still failing, will not store a hashing vector.")
+        return None
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embeds many texts with one encoder call for the cache misses."""
+        vectors: List[Optional[List[float]]] = [self.embedding_cache.get(content_hash(text)) for text in texts]
+        # Each distinct uncached text is encoded once, however often it repeats
+        misses: Dict[str, List[int]] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                misses.setdefault(texts[i], []).append(i)
+        if misses:
+            batch = list(misses)
+            encoded, fallback = self._encode(batch)
+            for text, vector in zip(batch, encoded):
+                if fallback:
+                    embedding = FallbackVector(vector.tolist())
+                else:
+                    embedding = vector.tolist()
+                    self.embedding_cache.set(content_hash(text), embedding)
+                for i in misses[text]:
+                    vectors[i] = embedding
+        return vectors
+
+    def _memory_record(
+        self, text: str, emotion: Dict[str, float], embedding: Sequence[float], user_id: str
+    ) -> Dict[str, Any]:
+        """Pushes the turn to the hot tier and returns its Chroma record."""
+        now = datetime.now()
+        timestamp = now.isoformat()
+        stored_us = epoch_us(now)
         numeric_vals = [value for value in emotion.values() if isinstance(value, (int, float))]
         intensity = max(numeric_vals) if numeric_vals else 0.0
-        
-        # สร้าง Mock Vector (ถ้ามี model จริงให้ใช้ sentence_transformers encode ตรงนี้)
-        # embedding = model.encode(text).tolist()
-        dummy_embedding = self._embed_text(text)
+
+        memory_id = self.id_assigner.assign(user_id, text)
+
+        self.hot_tier.push(user_id, {
+            "id": memory_id,
+            "text": text,
+            "embedding": list(embedding),
+            "timestamp": timestamp,
+            "epoch_us": stored_us,
+            "intensity": intensity,
+        })
+
+        return {
+            "id": memory_id,
+            "document": text,
+            "embedding": list(embedding),
+            "metadata": {
+                "user_id": user_id,
+                "timestamp": timestamp,
+                "epoch_us": stored_us,
+                "emotion_json": json.dumps(emotion),
+                "intensity": intensity
+            },
+        }
+
+    def store_memory(
+        self,
+        text: str,
+        emotion: Dict[str, float],
+        embedding: Optional[Sequence[float]] = None,
+        user_id: str = "anonymous",
+    ) -> str:
+        """บันทึกความจำใหม่"""
+        if embedding is None:
+            embedding = self.embed(text)
+        embedding = self._persistable(text, embedding)
+        if embedding is None:
+            return "memory_skipped"
+
+        record = self._memory_record(text, emotion, embedding, user_id)
+        intensity = record["metadata"]["intensity"]
 
         if self.vector_db:
+            # Queue for a bulk insert; write inline only when write-behind is off or shut down
+            if self.write_buffer is not None and not self.write_buffer.closed:
+                self.write_buffer.put(record)
+            else:
+                try:
+                    self._bulk_upsert([record])
+                    logger.info(f"Memory stored successfully. Intensity: {intensity:.2f}")
+                except Exception as e:
+                    logger.error(f"Error storing memory: {e}")
+
+        return "memory_stored"
+
+    def store_memories(
+        self,
+        texts: Sequence[str],
+        emotions: Sequence[Dict[str, float]],
+        embeddings: Sequence[Sequence[float]],
+        user_ids: Sequence[str],
+    ) -> int:
+        """
+        Stores many turns with a single Chroma upsert (bulk back-fill path).
+        Returns how many were stored; see ``_persistable`` for skipped turns.
+        """
+        records = []
+        for text, emotion, embedding, user_id in zip(texts, emotions, embeddings, user_ids):
+            vector = self._persistable(text, embedding)
+            if vector is not None:
+                records.append(self._memory_record(text, emotion, vector, user_id))
+        if self.vector_db and records:
             try:
-                self.vector_db.add(
-                    documents=[text],
-                    embeddings=[dummy_embedding],
-                    metadatas=[{
-                        "timestamp": timestamp,
-                        "emotion_json": json.dumps(emotion),
-                        "intensity": intensity
-                    }],
-                    ids=[f"mem_{datetime.now().timestamp()}"]
-                )
-                logger.info(f"Memory stored successfully. Intensity: {intensity:.2f}")
+                self._bulk_upsert(records)
             except Exception as e:
-                logger.error(f"Error storing memory: {e}")
+                logger.error(f"Error storing {len(records)} memories: {e}")
+        return len(records)
 
-        return "memory_stored"
+    def _bulk_upsert(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Writes many memory records to Chroma with a single ``upsert`` call.
+        Replayed records carry the same ID, so writing them again is a no-op.
+        """
+        unique = {record["id"]: record for record in records}
+        records = list(unique.values())
+        with span(CHROMA_ADD_SPAN):
+            self.vector_db.upsert(
+                documents=[record["document"] for record in records],
+                embeddings=[record["embedding"] for record in records],
+                metadatas=[record["metadata"] for record in records],
+                ids=[record["id"] for record in records],
+            )
+
+    def flush(self) -> None:
+        """Writes any buffered memories to Chroma now."""
+        if self.write_buffer is not None:
+            self.write_buffer.flush()
 
-    def retrieve_context(self, query: str, current_emotion: Dict[str, float], k: int = 3):
+    def close(self) -> None:
+        """Drains the write-behind buffer; later writes go straight to Chroma."""
+        if self.write_buffer is not None:
+            self.write_buffer.close()
+
+    def retrieve_context(
+        self,
+        query: str,
+        current_emotion: Optional[Dict[str, float]] = None,
+        k: int = 3,
+        embedding: Optional[Sequence[float]] = None,
+        user_id: str = "anonymous",
+    ):
         """รื้อฟื้นความจำโดยใช้อารมณ์ปัจจุบันเป็นตัวกระตุ้น"""
-        if not self.vector_db:
+        query_vec = embedding if embedding is not None else self.embed(query)
+        if isinstance(query_vec, FallbackVector):
+            # A hashing vector would be compared against another embedding space
             return []
+        query_vec = list(query_vec)
+
+        # Answer from the hot tier when it alone can fill k results
+        hot_turns = self.hot_tier.recent(user_id)
+        if hot_turns and len(hot_turns) >= k:
+            self.hot_tier.record_hit()
+            return self._rank_hot_turns(hot_turns, query_vec, k)
+        self.hot_tier.record_miss()
+
+        if not self.vector_db:
+            return self._rank_hot_turns(hot_turns, query_vec, k)
+        return self._query_vector_db([query_vec], user_id, k)[0]
+
+    def retrieve_context_batch(
+        self,
+        queries: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        user_ids: Sequence[str],
+        k: int = 3,
+    ) -> List[List[str]]:
+        """
+        ``retrieve_context`` for many turns: one hot-tier read and at most one
+        Chroma query (carrying every query vector) per distinct user.
+        """
+        results: List[List[str]] = [[] for _ in queries]
+        by_user: Dict[str, List[int]] = {}
+        for i, user_id in enumerate(user_ids):
+            by_user.setdefault(user_id, []).append(i)
+
+        for user_id, indices in by_user.items():
+            # Fallback vectors belong to another embedding space: no context for those turns
+            indices = [i for i in indices if not isinstance(embeddings[i], FallbackVector)]
+            if not indices:
+                continue
+            hot_turns = self.hot_tier.recent(user_id)
+            from_hot = bool(hot_turns) and len(hot_turns) >= k
+            for _ in indices:
+                if from_hot:
+                    self.hot_tier.record_hit()
+                else:
+                    self.hot_tier.record_miss()
+            if from_hot or not self.vector_db:
+                for i in indices:
+                    results[i] = self._rank_hot_turns(hot_turns, list(embeddings[i]), k)
+                continue
+            matches = self._query_vector_db([list(embeddings[i]) for i in indices], user_id, k)
+            for i, documents in zip(indices, matches):
+                results[i] = documents
+        return results
+
+    def _query_vector_db(self, query_vecs: List[List[float]], user_id: str, k: int) -> List[List[str]]:
+        """One Chroma query for one user's query vectors; re-ranked documents per vector."""
+        overfetch = max(1, int(self.settings.MEMORY_OVERFETCH_FACTOR))
+        include = ["documents", "metadatas"]
+        if overfetch > 1:
+            include.append("embeddings")
 
-        # สร้าง Query Vector (จำลอง)
-        dummy_query_vec = self._embed_text(query)
-        
         try:
-            results = self.vector_db.query(
-                query_embeddings=[dummy_query_vec],
-                n_results=k,
-                include=["documents", "metadatas"]
-            )
+            # Partition by user: search only this user's memories, never another's
+            with span(CHROMA_QUERY_SPAN):
+                results = self.vector_db.query(
+                    query_embeddings=query_vecs,
+                    n_results=k * overfetch,
+                    where={"user_id": user_id},
+                    include=include
+                )
             # คืนค่าเฉพาะเนื้อหาข้อความ
             documents = results.get('documents', [])
             metadatas = results.get('metadatas', [])
+            embeddings = results.get('embeddings') if overfetch > 1 else None
 
-            if documents and metadatas:
-                scored_results = []
-                for doc, meta in zip(documents[0], metadatas[0]):
-                    timestamp = meta.get("timestamp") if isinstance(meta, dict) else None
-                    intensity = float(meta.get("intensity", 0.0)) if isinstance(meta, dict) else 0.0
-                    temporal_score = self._calculate_temporal_relevance(timestamp) if timestamp else 1.0
-                    combined_score = temporal_score * max(intensity, 0.0)
-                    scored_results.append((doc, combined_score))
-
-                scored_results.sort(key=lambda item: item[1], reverse=True)
-                return [doc for doc, _ in scored_results]
-
-            return documents[0] if documents else []
+            ranked: List[List[str]] = []
+            for i, query_vec in enumerate(query_vecs):
+                docs = documents[i] if i < len(documents) else []
+                if documents and metadatas:
+                    ranked.append(rerank(
+                        docs,
+                        metadatas[i],
+                        self.phi,
+                        k=k,
+                        query_embedding=query_vec if embeddings is not None else None,
+                        embeddings=embeddings[i] if embeddings is not None else None,
+                    ))
+                else:
+                    ranked.append(docs)
+            return ranked
         except Exception as e:
             logger.error(f"Error retrieving context: {e}")
+            return [[] for _ in query_vecs]
+
+    def _rank_hot_turns(self, turns: List[Dict[str, Any]], query_vec: List[float], k: int) -> List[str]:
+        """Picks the k most similar hot turns, then applies the usual re-ranking."""
+        if not turns or k <= 0:
             return []
+        similarities = cosine_similarities(query_vec, [turn.get("embedding") or [] for turn in turns])
+        nearest = np.argsort(-similarities, kind="stable")[:k]
+        candidates = [turns[i] for i in nearest]
+        return rerank([turn.get("text", "") for turn in candidates], metadata_of(candidates), self.phi)
+
+    def remember_and_recall(
+        self, text: str, emotion: Dict[str, float], k: int = 3, user_id: str = "anonymous"
+    ) -> List[str]:
+        """Stores ``text`` and retrieves related context with one shared embedding."""
+        embedding = self.embed(text)
+        self.store_memory(text, emotion, embedding=embedding, user_id=user_id)
+        return self.retrieve_context(text, emotion, k=k, embedding=embedding, user_id=user_id)
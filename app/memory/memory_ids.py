@@ -0,0 +1,105 @@
+"""Sortable, collision-free memory IDs and idempotency keys."""
+from __future__ import annotations
+
+import hashlib
+import os
+import secrets
+import socket
+import threading
+import time
+from typing import Optional
+
+from app.core.ttl_cache import TTLCache, content_hash
+
+# Crockford base32 keeps IDs case-insensitive and lexicographically sortable.
+CROCKFORD_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_TIME_CHARS = 10  # 48-bit millisecond timestamp
+_NODE_CHARS = 4  # 20-bit node id
+_SEQ_CHARS = 12  # 60-bit monotonic sequence
+_SEQ_MAX = (1 << (5 * _SEQ_CHARS)) - 1
+
+
+def _encode(value: int, length: int) -> str:
+    chars = []
+    for _ in range(length):
+        value, rem = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[rem])
+    return "".join(reversed(chars))
+
+
+def default_node_id() -> str:
+    """Derives a short node id from host name and process id."""
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode("utf-8")
+    value = int.from_bytes(hashlib.sha256(seed).digest()[:4], "big") >> 12
+    return _encode(value, _NODE_CHARS)
+
+
+class MemoryIdGenerator:
+    """
+    ULID-style IDs laid out as ``mem_<time><node><sequence>``.
+
+    The millisecond timestamp comes first, so IDs sort by creation time and a
+    time range maps to an ID prefix range. Within one millisecond the sequence
+    is incremented instead of re-randomized, keeping IDs strictly monotonic per
+    process; the node segment keeps concurrent processes from colliding.
+    """
+
+    prefix = "mem_"
+
+    def __init__(self, node_id: Optional[str] = None) -> None:
+        node = (node_id or default_node_id()).upper()
+        if len(node) != _NODE_CHARS or any(ch not in CROCKFORD_ALPHABET for ch in node):
+            raise ValueError(f"node_id must be {_NODE_CHARS} Crockford base32 characters, got {node_id!r}")
+        self.node_id = node
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._seq = 0
+
+    def new_id(self, now_ms: Optional[int] = None) -> str:
+        with self._lock:
+            ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+            if ms <= self._last_ms:
+                # Same (or skewed-back) millisecond: stay monotonic
+                ms = self._last_ms
+                self._seq += 1
+                if self._seq > _SEQ_MAX:
+                    ms += 1
+                    self._seq = secrets.randbits(5 * _SEQ_CHARS - 1)
+            else:
+                # Random start leaves headroom for increments within the millisecond
+                self._seq = secrets.randbits(5 * _SEQ_CHARS - 1)
+            self._last_ms = ms
+            return f"{self.prefix}{_encode(ms, _TIME_CHARS)}{self.node_id}{_encode(self._seq, _SEQ_CHARS)}"
+
+    @classmethod
+    def time_prefix(cls, epoch_ms: int) -> str:
+        """ID prefix for a millisecond timestamp, usable as a range-scan bound."""
+        return f"{cls.prefix}{_encode(int(epoch_ms), _TIME_CHARS)}"
+
+
+def idempotency_key(user_id: str, text: str) -> str:
+    """Key identifying 'this user said this text', independent of when."""
+    return f"{user_id}:{content_hash(text)}"
+
+
+class MemoryIdAssigner:
+    """
+    Hands out memory IDs so that a replay of the same user + content within
+    ``window_seconds`` gets the ID it was first assigned. Combined with Chroma
+    ``upsert`` this makes retried requests and replayed bulk writes idempotent.
+    """
+
+    def __init__(self, generator: MemoryIdGenerator, window_seconds: float, maxsize: int = 10_000) -> None:
+        self.generator = generator
+        self._assigned: TTLCache[str] = TTLCache(maxsize=maxsize, ttl_seconds=window_seconds)
+        self._lock = threading.Lock()
+
+    def assign(self, user_id: str, text: str) -> str:
+        key = idempotency_key(user_id, text)
+        with self._lock:
+            memory_id = self._assigned.get(key)
+            if memory_id is None:
+                memory_id = self.generator.new_id()
+                self._assigned.set(key, memory_id)
+            return memory_id
@@ -1,44 +1,163 @@
-"""JSON-backed persistence for memory entries."""
+"""Append-only JSON Lines persistence for memory entries."""
 from __future__ import annotations
 
 import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Deque, Iterator
 
 from app.core.config import get_settings
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore
+
 
 class PersistenceAdapter:
-    def __init__(self, path: str | Path | None = None, max_entries: int | None = None) -> None:
+    """
+    Stores entries in a JSON Lines journal.
+
+    ``append`` writes one line under an exclusive file lock, so concurrent
+    workers never lose each other's updates. The last ``max_entries`` entries are
+    kept in an in-memory tail that ``load`` serves without re-reading the file
+    unless another process has written since. Once the journal holds
+    ``compact_factor`` times the retention limit it is rewritten down to the
+    tail. A legacy ``memory_log.json`` array is imported on first use.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        max_entries: int | None = None,
+        compact_factor: int | None = None,
+    ) -> None:
         settings = get_settings()
-        resolved_path = path or settings.MEMORY_PATH
+        resolved_path = Path(path or settings.MEMORY_PATH)
         resolved_max = max_entries or settings.MAX_MEMORY_ENTRIES
 
         self.enabled = settings.FEATURE_FLAGS.get("ENABLE_MEMORY", True)
-        self.path = Path(resolved_path)
+        self.legacy_path = resolved_path if resolved_path.suffix == ".json" else None
+        self.path = resolved_path.with_suffix(".jsonl")
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.max_entries = resolved_max
-        if not self.path.exists():
-            self._write([])
+        self.compact_factor = max(2, compact_factor or settings.MEMORY_COMPACT_FACTOR)
+
+        self._thread_lock = threading.Lock()
+        self._tail: Deque[dict[str, Any]] = deque(maxlen=self.max_entries)
+        self._line_count = 0
+        self._offset = 0
+        self._file_id: tuple[int, int] | None = None
+
+        if self.enabled:
+            with self._locked():
+                self._migrate_legacy()
+                self._refresh()
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with self.lock_path.open("a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _migrate_legacy(self) -> None:
+        """Imports a legacy JSON array file into an empty journal (the old file is left as is)."""
+        if self.legacy_path is None or not self.legacy_path.exists() or self.path.exists():
+            return
+        try:
+            with self.legacy_path.open("r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, list):
+            self._rewrite(entries[-self.max_entries :])
+
+    def _stat(self) -> os.stat_result | None:
+        try:
+            return self.path.stat()
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self) -> None:
+        """Folds lines appended since the last read (by any process) into the tail."""
+        stat = self._stat()
+        if stat is None:
+            self._tail.clear()
+            self._line_count = self._offset = 0
+            self._file_id = None
+            return
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            # Compacted or replaced by another process: re-read from the start
+            self._tail.clear()
+            self._line_count = self._offset = 0
+            self._file_id = file_id
+
+        if stat.st_size == self._offset:
+            return
+
+        with self.path.open("rb") as f:
+            f.seek(self._offset)
+            chunk = f.read()
+        # Ignore a trailing partial line; it is picked up on the next refresh
+        complete = chunk[: chunk.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                try:
+                    self._tail.append(json.loads(line))
+                except ValueError:
+                    continue
+                self._line_count += 1
+        self._offset += len(complete)
 
-    def _read(self) -> list[dict[str, Any]]:
-        with self.path.open("r", encoding="utf-8") as f:
-            return json.load(f)
+    def _rewrite(self, entries: list[dict[str, Any]]) -> None:
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
 
-    def _write(self, data: list[dict[str, Any]]) -> None:
-        with self.path.open("w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+    def _compact(self) -> None:
+        self._rewrite(list(self._tail))
+        self._file_id = None
+        self._refresh()
 
     def append(self, entry: dict[str, Any]) -> None:
         if not self.enabled:
             return
-        entries = self._read()
-        entries.append(entry)
-        if len(entries) > self.max_entries:
-            entries = entries[-self.max_entries :]
-        self._write(entries)
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._locked():
+            self._refresh()
+            with self.path.open("ab") as f:
+                f.write(line)
+            self._refresh()
+            if self._line_count > self.max_entries * self.compact_factor:
+                self._compact()
 
     def load(self) -> list[dict[str, Any]]:
         if not self.enabled:
             return []
-        return self._read()
+        stat = self._stat()
+        unchanged = (
+            stat is not None
+            and (stat.st_dev, stat.st_ino) == self._file_id
+            and stat.st_size == self._offset
+        )
+        if not unchanged:
+            with self._locked():
+                self._refresh()
+                return list(self._tail)
+        with self._thread_lock:
+            return list(self._tail)
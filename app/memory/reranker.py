@@ -0,0 +1,120 @@
+"""Vectorized re-ranking of memory candidates (temporal decay x intensity x similarity)."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def epoch_us(moment: datetime) -> int:
+    """
+    Whole microseconds from 1970-01-01 to ``moment`` on its own clock (naive
+    stays naive), so differences equal datetime subtraction exactly.
+    """
+    return (moment - (_EPOCH if moment.tzinfo is None else _EPOCH_UTC)) // _MICROSECOND
+
+
+def _ages_in_hours(metadatas: Sequence[Any], now: datetime) -> np.ndarray:
+    """Age of each candidate in hours; NaN when it carries no usable time."""
+    now_us = epoch_us(now)
+    ages = np.full(len(metadatas), np.nan, dtype=np.float64)
+    for i, meta in enumerate(metadatas):
+        if not isinstance(meta, dict):
+            continue
+        stored_us = meta.get("epoch_us")
+        if isinstance(stored_us, int):
+            # Integer microseconds / 10**6 is exactly what timedelta.total_seconds() computes
+            ages[i] = (now_us - stored_us) / 10**6 / 3600
+            continue
+        # Records written before the numeric field existed only have an ISO timestamp
+        timestamp = meta.get("timestamp")
+        if timestamp:
+            try:
+                ages[i] = (now - datetime.fromisoformat(timestamp)).total_seconds() / 3600
+            except (TypeError, ValueError):
+                pass
+    return ages
+
+
+def score_candidates(
+    metadatas: Sequence[Any],
+    phi: float,
+    now: Optional[datetime] = None,
+    similarities: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """
+    Scores candidates as ``phi ** -(age_hours / 24) * max(intensity, 0)``, optionally
+    multiplied by the cosine similarity clipped at zero.
+
+    ``np.float_power`` is used on purpose: it goes through the scalar ``pow`` for
+    float64, so the decay matches Python's ``phi ** x`` bit for bit (the SIMD
+    ``np.power`` loop can differ in the last ulp).
+    """
+    now = now or datetime.now()
+    ages = _ages_in_hours(metadatas, now)
+    intensities = np.array(
+        [float(meta.get("intensity", 0.0)) if isinstance(meta, dict) else 0.0 for meta in metadatas],
+        dtype=np.float64,
+    )
+
+    temporal = np.ones(len(metadatas), dtype=np.float64)
+    known = ~np.isnan(ages)
+    temporal[known] = 1.0 / np.float_power(phi, ages[known] / 24.0)
+
+    scores = temporal * np.maximum(intensities, 0.0)
+    if similarities is not None:
+        scores = scores * np.maximum(np.asarray(similarities, dtype=np.float64), 0.0)
+    return scores
+
+
+def cosine_similarities(query: Optional[Sequence[float]], vectors: Sequence[Sequence[float]]) -> np.ndarray:
+    """Cosine similarity of ``query`` against each vector (0.0 for degenerate inputs)."""
+    if query is None or len(vectors) == 0:
+        return np.zeros(len(vectors), dtype=np.float64)
+    matrix = np.asarray(vectors, dtype=np.float64)
+    q = np.asarray(query, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(q)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(norms > 0, matrix @ q / norms, 0.0)
+
+
+def rerank(
+    documents: Sequence[str],
+    metadatas: Sequence[Any],
+    phi: float,
+    k: Optional[int] = None,
+    now: Optional[datetime] = None,
+    query_embedding: Optional[Sequence[float]] = None,
+    embeddings: Optional[Sequence[Sequence[float]]] = None,
+) -> List[str]:
+    """
+    Returns up to ``k`` documents ordered by score, highest first. Similarity only
+    enters the score when candidate embeddings and a query embedding are given
+    (the over-fetch path); otherwise ordering matches the original formula.
+    Ties keep the incoming (nearest-neighbour) order.
+    """
+    if len(documents) == 0:
+        return []
+    similarities = None
+    if query_embedding is not None and embeddings is not None and len(embeddings) == len(documents):
+        similarities = cosine_similarities(query_embedding, embeddings)
+
+    scores = score_candidates(metadatas, phi, now=now, similarities=similarities)
+    order = np.argsort(-scores, kind="stable")
+    if k is not None:
+        order = order[:k]
+    return [documents[i] for i in order]
+
+
+def metadata_of(turns: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Projects hot-tier turns onto the metadata fields the scorer reads."""
+    return [
+        {key: turn.get(key) for key in ("epoch_us", "timestamp", "intensity") if turn.get(key) is not None}
+        for turn in turns
+    ]
@@ -0,0 +1,166 @@
+"""Short-term (hot) memory tier holding each user's recent turns."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+
+class LocalHotStore:
+    """
+    In-process stand-in for the subset of ``redis.Redis`` the hot tier uses
+    (lists with per-key expiry). Used when no Redis server is reachable.
+    """
+
+    def __init__(self) -> None:
+        self._lists: Dict[str, List[str]] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _expire_if_needed(self, key: str) -> None:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._lists.pop(key, None)
+            self._expires.pop(key, None)
+
+    def ping(self) -> bool:
+        return True
+
+    def lpush(self, key: str, *values: str) -> int:
+        with self._lock:
+            self._expire_if_needed(key)
+            items = self._lists.setdefault(key, [])
+            for value in values:
+                items.insert(0, value)
+            return len(items)
+
+    def ltrim(self, key: str, start: int, end: int) -> bool:
+        with self._lock:
+            self._expire_if_needed(key)
+            if key in self._lists:
+                stop = None if end == -1 else end + 1
+                self._lists[key] = self._lists[key][start:stop]
+            return True
+
+    def lrange(self, key: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            self._expire_if_needed(key)
+            stop = None if end == -1 else end + 1
+            return list(self._lists.get(key, [])[start:stop])
+
+    def expire(self, key: str, seconds: int) -> bool:
+        with self._lock:
+            if key not in self._lists:
+                return False
+            self._expires[key] = time.monotonic() + seconds
+            return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            removed = 0
+            for key in keys:
+                removed += self._lists.pop(key, None) is not None
+                self._expires.pop(key, None)
+            return removed
+
+    def pipeline(self) -> "_LocalPipeline":
+        return _LocalPipeline(self)
+
+
+class _LocalPipeline:
+    """Queues calls and runs them on ``execute()``, mirroring ``redis.client.Pipeline``."""
+
+    def __init__(self, store: LocalHotStore) -> None:
+        self._store = store
+        self._calls: List[Any] = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._store, name)
+
+        def queue(*args: Any, **kwargs: Any) -> "_LocalPipeline":
+            self._calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> List[Any]:
+        calls, self._calls = self._calls, []
+        return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+class ShortTermTier:
+    """
+    Keeps the last ``max_turns`` turns (text, embedding, metadata) per user in
+    Redis or :class:`LocalHotStore`, expiring ``ttl_seconds`` after the last write.
+    """
+
+    def __init__(self, client: Any, ttl_seconds: int, max_turns: int, key_prefix: str = "namo:stm:") -> None:
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.max_turns = max(1, int(max_turns))
+        self.key_prefix = key_prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    def push(self, user_id: str, record: Dict[str, Any]) -> None:
+        key = self._key(user_id)
+        try:
+            pipe = self.client.pipeline()
+            pipe.lpush(key, json.dumps(record))
+            pipe.ltrim(key, 0, self.max_turns - 1)
+            pipe.expire(key, self.ttl_seconds)
+            pipe.execute()
+        except Exception:
+            with self._lock:
+                self.errors += 1
+
+    def recent(self, user_id: str) -> List[Dict[str, Any]]:
+        """Most recent turns first."""
+        try:
+            raw = self.client.lrange(self._key(user_id), 0, self.max_turns - 1)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return []
+        turns: List[Dict[str, Any]] = []
+        seen = set()
+        for item in raw:
+            turn = json.loads(item)
+            # A replayed write re-pushes the same memory id; keep the newest copy
+            memory_id = turn.get("id")
+            if memory_id is not None:
+                if memory_id in seen:
+                    continue
+                seen.add(memory_id)
+            turns.append(turn)
+        return turns
+
+    def record_hit(self) -> None:
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "local" if isinstance(self.client, LocalHotStore) else "redis",
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                # Every hit answered without a Chroma query
+                "chroma_queries_saved": self.hits,
+                "ttl_seconds": self.ttl_seconds,
+                "max_turns": self.max_turns,
+            }
+
@@ -0,0 +1,150 @@
+"""Write-behind buffer that batches memory inserts off the request path."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "block")
+
+
+class WriteBehindBuffer:
+    """
+    Accumulates records in a bounded queue and hands them to ``sink`` in bulk.
+
+    A background thread flushes whenever ``max_batch_size`` records are waiting or
+    ``flush_interval_ms`` has passed since the first record of the batch arrived.
+    When the queue is full, the ``drop`` policy discards the new record and the
+    ``block`` policy waits up to ``block_timeout`` seconds for space first.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[Dict[str, Any]]], None],
+        max_batch_size: int = 64,
+        flush_interval_ms: float = 200.0,
+        max_queue_size: int = 2048,
+        overflow_policy: str = "drop",
+        block_timeout: float = 1.0,
+        name: str = "memory-write-behind",
+    ) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow_policy must be one of {OVERFLOW_POLICIES}, got {overflow_policy!r}")
+        self.sink = sink
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.flush_interval = max(0.0, float(flush_interval_ms)) / 1000.0
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, int(max_queue_size)))
+        self._closed = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.flushed = 0
+        self.failed = 0
+        self.flushes = 0
+
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def put(self, record: Dict[str, Any]) -> bool:
+        """Queues a record; returns False if it was dropped because the queue is full."""
+        if self.closed:
+            raise RuntimeError(f"{self.name} is closed")
+        try:
+            if self.overflow_policy == "block":
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            logger.warning("%s queue full; dropping memory write", self.name)
+            return False
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def _take_batch(self, first_timeout: float, linger: bool) -> List[Dict[str, Any]]:
+        try:
+            if first_timeout > 0:
+                first = self._queue.get(timeout=first_timeout)
+            else:
+                first = self._queue.get_nowait()
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if linger and remaining > 0 and not self.closed:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            self.sink(batch)
+        except Exception as exc:
+            logger.error("%s bulk write of %d records failed: %s", self.name, len(batch), exc)
+            with self._stats_lock:
+                self.failed += len(batch)
+        else:
+            with self._stats_lock:
+                self.flushed += len(batch)
+                self.flushes += 1
+
+    def _run(self) -> None:
+        while not self.closed:
+            with self._flush_lock:
+                batch = self._take_batch(first_timeout=0.1, linger=True)
+                if batch:
+                    self._write(batch)
+        self._drain()
+
+    def _drain(self) -> None:
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch(first_timeout=0, linger=False)
+                if not batch:
+                    return
+                self._write(batch)
+
+    def flush(self) -> None:
+        """Synchronously writes everything queued so far."""
+        self._drain()
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Stops accepting records and drains the queue to the sink."""
+        self._closed.set()
+        self._worker.join(timeout)
+        self._drain()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self._queue.maxsize,
+                "overflow_policy": self.overflow_policy,
+                "enqueued": self.enqueued,
+                "flushed": self.flushed,
+                "flushes": self.flushes,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "closed": self.closed,
+            }
@@ -1,14 +1,24 @@
 # app/personality/namo_persona_core.py
+import asyncio
+import logging
 from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 from app.core.config import get_settings
+from app.core.execution import IO_STAGE, MODEL_STAGE, StageExecutor, StageOverloadedError
+from app.core.metrics import EMBEDDING_SPAN, EMOTION_SPAN, REFLECTION_SPAN, span
+from app.core.stage_graph import Stage, StageGraph
 from app.personality.dhammic_reflection_engine import DhammicReflectionEngine
 from app.memory.retrieval_engine import RetrievalEngine
 
 # [IMPORT] The Infinite Brain & The Neuro-Empathic Heart
 from app.memory.infinity_memory import InfinityMemorySystem
-from app.emotion.neuro_empathic_mirror import NeuroEmpathicMirror
+from app.emotion.neuro_empathic_mirror import EmpathicResponse, NeuroEmpathicMirror
+
+logger = logging.getLogger(__name__)
+
+# Back-off between attempts when the IO stage rejects a background memory store
+_STORE_RETRY_DELAYS_S = (0.05, 0.2, 0.5, 1.0, 2.0)
 
 @dataclass
 class NamoPersonaCore:
@@ -21,60 +31,254 @@ class NamoPersonaCore:
     """
     # Subsystems Initialization
     empathic_mirror: NeuroEmpathicMirror = field(default_factory=NeuroEmpathicMirror)
-    infinity_memory: InfinityMemorySystem = field(default_factory=InfinityMemorySystem)
+    # None while the memory system is still warming up (replies skip recall)
+    infinity_memory: Optional[InfinityMemorySystem] = field(default_factory=InfinityMemorySystem)
     reflection_engine: DhammicReflectionEngine = field(default_factory=DhammicReflectionEngine)
     retrieval_engine: RetrievalEngine = field(default_factory=RetrievalEngine)
+    # Blocking model / Chroma calls run on bounded per-stage thread pools
+    executor: StageExecutor = field(default_factory=StageExecutor)
+    _pending_stores: Set["asyncio.Task[None]"] = field(default_factory=set, init=False, repr=False)
+    _store_stats: Dict[str, int] = field(
+        default_factory=lambda: {"stored": 0, "retried": 0, "dropped": 0, "failed": 0}, init=False, repr=False
+    )
+
+    async def process(self, text: str, user_id: str = "anonymous") -> Dict[str, Any]:
+        result: Dict[str, Any] = {}
+        async for event in self.process_stream(text, user_id=user_id):
+            if event["event"] == "done":
+                result = event["result"]
+        return result
 
-    async def process(self, text: str) -> Dict[str, Any]:
+    async def process_stream(self, text: str, user_id: str = "anonymous") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Runs the persona pipeline and yields each partial result as soon as it
+        is ready: ``empathy`` (template reply), ``memory`` (recalled context),
+        ``reflection`` (Dhammic reflection) and finally ``done`` with the full
+        result that ``process`` returns.
+
+        Stages form a dependency graph: emotion analysis and embedding+recall
+        run concurrently (recall does not need the emotion), reflection waits
+        for both, and the memory store runs in the background after the reply
+        is built (see ``drain``).
+        """
         settings = get_settings()
-        
+        # Read once: warm-up may swap subsystems in while this turn is running
+        mirror = self.empathic_mirror
+        memory = self.infinity_memory
+        if not settings.FEATURE_FLAGS.get("ENABLE_INFINITY_MEMORY", True):
+            memory, memory_note = None, "Memory system inactive."
+        else:
+            memory_note = "Memory system warming up."
+
         # 1. [HEART] Feel the user's emotion using Neural Network
         # ใช้หัวใจสัมผัสความรู้สึก (แทน Analyzer ตัวเก่า)
-        empathic_result = self.empathic_mirror.reflect(text)
-        
-        # แปลงค่าอารมณ์เพื่อส่งต่อให้ระบบอื่น
-        current_emotion_state = {
-            "coherence": empathic_result.emotional_matching_score,
-            "support_level": empathic_result.support_level
-        }
+        async def empathy():
+            with span(EMOTION_SPAN):
+                return await self.executor.run(MODEL_STAGE, mirror.reflect, text)
+
+        # 2. [BRAIN] Retrieve Context
+        # Embed once per turn; retrieve and the later store share the same vector
+        async def embedding():
+            with span(EMBEDDING_SPAN):
+                return await self.executor.run(MODEL_STAGE, memory.embed, text)
 
-        # 2. [BRAIN] Store & Retrieve Context
-        # บันทึกความจำพร้อม Tag อารมณ์ที่วัดได้
-        if settings.FEATURE_FLAGS.get("ENABLE_INFINITY_MEMORY", True):
-            self.infinity_memory.store_memory(text, current_emotion_state)
-            
-            # รื้อฟื้นความจำที่สัมพันธ์กับอารมณ์ปัจจุบัน
-            context_memories = self.infinity_memory.retrieve_context(
-                query=text, 
-                current_emotion=current_emotion_state
+        async def recall(embedding):
+            # รื้อฟื้นความจำที่เกี่ยวข้อง
+            context_memories = await self.executor.run(
+                IO_STAGE,
+                memory.retrieve_context,
+                query=text,
+                embedding=embedding,
+                user_id=user_id,
             )
-            context_str = " | ".join(context_memories) if context_memories else "No historical context."
-        else:
-            context_str = "Memory system inactive."
+            return " | ".join(context_memories) if context_memories else "No historical context."
+
+        async def memory_inactive():
+            return memory_note
 
         # 3. [WISDOM] Reflect with Dharma
         # ใช้ปัญญาพิจารณา โดยมี Golden Ratio คุมอยู่เบื้องหลัง
-        reflection = self.reflection_engine.reflect(
+        async def reflect(empathy, recall):
+            with span(REFLECTION_SPAN):
+                return self._reflect(text, empathy, recall)
+
+        stages = [Stage("empathy", empathy)]
+        if memory is not None:
+            stages += [Stage("embedding", embedding), Stage("recall", recall, deps=("embedding",))]
+        else:
+            stages.append(Stage("recall", memory_inactive))
+        stages.append(Stage("reflection", reflect, deps=("empathy", "recall")))
+        graph = StageGraph(stages)
+
+        results: Dict[str, Any] = {}
+        async for name, value in graph.run_iter():
+            results[name] = value
+            if name == "empathy":
+                yield {
+                    "event": "empathy",
+                    "response_text": value.response_text,
+                    "tone": value.support_level,
+                    "coherence": value.emotional_matching_score,
+                }
+            elif name == "recall":
+                yield {"event": "memory", "memory_context": f"Brain Context: {value[:100]}..."}
+            elif name == "reflection":
+                yield {
+                    "event": "reflection",
+                    "reflection": value.get("reflection", ""),
+                    "moral_index": value.get("moral_index", 0.0),
+                    "dhamma_tags": [value.get("tone")],
+                }
+
+        empathic_result = results["empathy"]
+
+        # บันทึกความจำพร้อม Tag อารมณ์ที่วัดได้ -- off the critical path
+        if memory is not None:
+            self._store_in_background(
+                memory.store_memory,
+                text,
+                self._emotion_tag(empathic_result),
+                embedding=results["embedding"],
+                user_id=user_id,
+            )
+
+        result = self._compose(empathic_result, results["recall"], results["reflection"])
+        result["stage_timings_ms"] = dict(graph.timings_ms)
+        yield {"event": "done", "result": result}
+
+    async def process_batch(self, items: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Runs the pipeline over many ``(text, user_id)`` turns at once: one
+        batched emotion call and one batched embedding call (concurrently),
+        grouped recall, then a single bulk memory store in the background.
+        Results are returned in input order, shaped like ``process``;
+        ``stage_timings_ms`` holds the timings of the shared batch stages.
+        """
+        if not items:
+            return []
+        settings = get_settings()
+        mirror = self.empathic_mirror
+        memory = self.infinity_memory
+        if not settings.FEATURE_FLAGS.get("ENABLE_INFINITY_MEMORY", True):
+            memory, memory_note = None, "Memory system inactive."
+        else:
+            memory_note = "Memory system warming up."
+        texts = [text for text, _ in items]
+        user_ids = [user_id for _, user_id in items]
+
+        async def empathy():
+            with span(EMOTION_SPAN):
+                return await self.executor.run(MODEL_STAGE, mirror.reflect_batch, texts)
+
+        async def embedding():
+            with span(EMBEDDING_SPAN):
+                return await self.executor.run(MODEL_STAGE, memory.embed_batch, texts)
+
+        async def recall(embedding):
+            contexts = await self.executor.run(IO_STAGE, memory.retrieve_context_batch, texts, embedding, user_ids)
+            return [" | ".join(context) if context else "No historical context." for context in contexts]
+
+        async def memory_inactive():
+            return [memory_note] * len(texts)
+
+        async def reflect(empathy, recall):
+            reflections = []
+            for text, empathic, memory_context in zip(texts, empathy, recall):
+                with span(REFLECTION_SPAN):
+                    reflections.append(self._reflect(text, empathic, memory_context))
+            return reflections
+
+        stages = [Stage("empathy", empathy)]
+        if memory is not None:
+            stages += [Stage("embedding", embedding), Stage("recall", recall, deps=("embedding",))]
+        else:
+            stages.append(Stage("recall", memory_inactive))
+        stages.append(Stage("reflection", reflect, deps=("empathy", "recall")))
+        graph = StageGraph(stages)
+        results = await graph.run()
+
+        empathic_results = results["empathy"]
+        if memory is not None:
+            self._store_in_background(
+                memory.store_memories,
+                texts,
+                [self._emotion_tag(empathic) for empathic in empathic_results],
+                results["embedding"],
+                user_ids,
+            )
+
+        composed = []
+        for empathic, memory_context, reflection in zip(empathic_results, results["recall"], results["reflection"]):
+            result = self._compose(empathic, memory_context, reflection)
+            # Stages run once for the whole batch, so every item reports the batch timings
+            result["stage_timings_ms"] = dict(graph.timings_ms)
+            composed.append(result)
+        return composed
+
+    def _reflect(self, text: str, empathy: EmpathicResponse, memory_context: str) -> Dict[str, Any]:
+        return self.reflection_engine.reflect(
             state={
-                "emotional_matching_score": empathic_result.emotional_matching_score,
-                "support_level": empathic_result.support_level,
-                "memory_context": context_str
+                "emotional_matching_score": empathy.emotional_matching_score,
+                "support_level": empathy.support_level,
+                "memory_context": memory_context
             },
             text=text
         )
 
+    @staticmethod
+    def _emotion_tag(empathy: EmpathicResponse) -> Dict[str, Any]:
+        return {
+            "coherence": empathy.emotional_matching_score,
+            "support_level": empathy.support_level
+        }
+
+    @staticmethod
+    def _compose(empathic_result: EmpathicResponse, memory_context: str, reflection: Dict[str, Any]) -> Dict[str, Any]:
         # 4. [SYNTHESIS] Combine Everything
         # คำตอบสุดท้ายคือการรวม: ความเข้าอกเข้าใจ + บริบทความจำ + ปัญญาทางธรรม
         final_response = (
             f"{empathic_result.response_text}\n\n"
             f"{reflection.get('reflection', '')}"
         )
-
         return {
             "reflection_text": final_response,
             "tone": empathic_result.support_level,
             "moral_index": reflection.get("moral_index", 0.0),
             "coherence": empathic_result.emotional_matching_score,
-            "memory_summary": f"Brain Context: {context_str[:100]}...",
-            "dhamma_tags": [reflection.get("tone")]
-        }
\ No newline at end of file
+            "memory_summary": f"Brain Context: {memory_context[:100]}...",
+            "dhamma_tags": [reflection.get("tone")],
+        }
+
+    def _store_in_background(self, store_fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        async def store() -> None:
+            # The reply has already been sent, so overload cannot become a 503 any
+            # more; back off and retry instead of silently losing the turn
+            for delay in (*_STORE_RETRY_DELAYS_S, None):
+                try:
+                    await self.executor.run(IO_STAGE, store_fn, *args, **kwargs)
+                    self._store_stats["stored"] += 1
+                    return
+                except StageOverloadedError:
+                    if delay is None:
+                        break
+                    self._store_stats["retried"] += 1
+                    await asyncio.sleep(delay)
+                except Exception as exc:
+                    logger.warning("Background memory store failed: %s", exc)
+                    self._store_stats["failed"] += 1
+                    return
+            logger.error("Background memory store dropped: IO stage still overloaded after retries")
+            self._store_stats["dropped"] += 1
+
+        task = asyncio.ensure_future(store())
+        self._pending_stores.add(task)
+        task.add_done_callback(self._pending_stores.discard)
+
+    def store_stats(self) -> Dict[str, Any]:
+        """Outcome counts of background memory stores (dropped = lost to overload)."""
+        return {"pending": len(self._pending_stores), **self._store_stats}
+
+    async def drain(self) -> None:
+        """Waits for background memory stores still in flight (shutdown, tests)."""
+        while self._pending_stores:
+            await asyncio.gather(*list(self._pending_stores), return_exceptions=True)
@@ -1,9 +1,12 @@
 # app/safety/divine_shield.py
-import re
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional, Tuple
 
+from app.core.policy_registry import PolicyRegistry, get_policy_registry
+from app.core.verdict_cache import VerdictCache
+from app.safety.threat_matcher import ThreatMatcher
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -17,39 +20,52 @@ class DivineShield:
     The 8-Layer Protection System (Chinabanchorn Digital Shield).
     Filters toxic intent, prompt injections, and system threats.
     """
-    def __init__(self):
-        self.threat_patterns = self._load_policies()
+    MAX_INPUT_LENGTH = 2000
+
+    def __init__(
+        self,
+        policy_registry: Optional[PolicyRegistry] = None,
+        verdict_cache: Optional[VerdictCache[ShieldAssessment]] = None,
+    ):
+        self.policies = policy_registry or get_policy_registry()
+        self.verdicts = verdict_cache or VerdictCache("shield")
         logger.info("Divine Shield initialized with external policies.")
 
-    def _load_policies(self):
-        try:
-            from pathlib import Path
-            import json
-            # Resolve path relative to this file: app/safety/divine_shield.py -> app/core/policies.json
-            base_dir = Path(__file__).resolve().parent.parent # app/
-            policy_path = base_dir / "core" / "policies.json"
-            
-            with open(policy_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("threat_patterns", [])
-        except Exception as e:
-            logger.error(f"Failed to load policies.json: {e}")
-            # Fallback (Mini-Shield)
-            return [r"(kill|suicide|die|hurt)", r"(hate|destroy)"]
+    @property
+    def matcher(self) -> ThreatMatcher:
+        """Precompiled matcher of the current policy snapshot (hot-reloaded)."""
+        return self.policies.snapshot().matcher
+
+    @property
+    def threat_patterns(self) -> Tuple[str, ...]:
+        return self.matcher.patterns
+
+    def reload_policies(self) -> None:
+        """Forces the shared registry to re-read policies.json."""
+        self.policies.reload()
 
     def protect(self, text: str) -> ShieldAssessment:
         """Executes the protection layers."""
         if not text or len(text.strip()) == 0:
             return ShieldAssessment(False, 1.0, "Empty input")
 
-        # Layer 2: Threat Scan using threat_patterns
-        for pattern in self.threat_patterns:
-            if re.search(pattern, text.lower()):
-                return ShieldAssessment(False, 0.9, f"Threat detected: {pattern}")
+        # Layer 4: Expansion Check (Flood protection) -- cheapest, so it runs first
+        if len(text) > self.MAX_INPUT_LENGTH:
+            return ShieldAssessment(False, 0.5, "Input too long")
+
+        # Repeated inputs reuse the verdict computed under the same policy version
+        snapshot = self.policies.snapshot()
+        cached = self.verdicts.lookup(text, snapshot.version)
+        if cached is None:
+            cached = self._scan(text, snapshot.matcher)
+            self.verdicts.store(text, snapshot.version, cached)
+        return replace(cached)
 
-        # Layer 4: Expansion Check (Flood protection)
-        if len(text) > 2000:
-             return ShieldAssessment(False, 0.5, "Input too long")
+    def _scan(self, text: str, matcher: ThreatMatcher) -> ShieldAssessment:
+        # Layer 2: Threat Scan using the precompiled threat_patterns matcher
+        pattern = matcher.first_match(text.lower())
+        if pattern is not None:
+            return ShieldAssessment(False, 0.9, f"Threat detected: {pattern}")
 
         # Safe State
-        return ShieldAssessment(True, 0.0, "Safe")
\ No newline at end of file
+        return ShieldAssessment(True, 0.0, "Safe")
@@ -6,8 +6,12 @@ from typing import Any
 HARMFUL_KEYWORDS = {"harm", "violence", "attack", "weapon", "kill"}
 
 
+def flagged_keywords(lowered: str) -> list[str]:
+    """Harmful keywords contained in already-lowercased text (sorted for stable output)."""
+    return sorted(word for word in HARMFUL_KEYWORDS if word in lowered)
+
+
 def check_safe(text: str) -> dict[str, Any]:
-    lowered = text.lower()
-    flagged = [word for word in HARMFUL_KEYWORDS if word in lowered]
+    flagged = flagged_keywords(text.lower())
     safe = not flagged
     return {"safe": safe, "flagged": flagged}
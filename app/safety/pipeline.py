@@ -0,0 +1,177 @@
+"""Unified, staged safety pipeline with a single text normalisation pass."""
+from __future__ import annotations
+
+import logging
+import string
+import time
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.affect.suicide_safeguard import CRISIS_TEMPLATE, SuicideSafeguard
+from app.core.policy_registry import PolicySnapshot
+from app.core.text_normalization import normalize_unicode
+from app.core.verdict_cache import VerdictCache
+from app.safety.divine_shield import DivineShield
+from app.safety.guard import flagged_keywords
+from app.safety.risk_evaluator import RiskEvaluator
+from app.safety.threat_matcher import ThreatMatcher
+from engine.safety_guard import blocked_terms
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_STRIP = string.punctuation + "\u0e2f\u0e46\u0e5a\u0e5b"  # plus Thai paiyannoi, mai yamok, angkhankhu, khomut
+
+
+@dataclass(frozen=True)
+class NormalizedText:
+    raw: str
+    normalized: str
+    tokens: Tuple[str, ...]
+
+
+def normalize_text(text: str) -> NormalizedText:
+    """
+    NFKC, zero-width removal, Thai composite fix-ups, lowercase and collapsed
+    whitespace -- done once per request and shared by every safety stage.
+    """
+    normalized = normalize_unicode(text)
+    tokens = tuple(token for token in (part.strip(_TOKEN_STRIP) for part in normalized.split(" ")) if token)
+    return NormalizedText(raw=text, normalized=normalized, tokens=tokens)
+
+
+@dataclass
+class SafetyAssessment:
+    is_safe: bool
+    risk_level: float
+    reason: str
+    stage: str
+    category: str = "low"
+    flagged: List[str] = field(default_factory=list)
+    safe_reply: Optional[str] = None
+    timings_ms: Dict[str, float] = field(default_factory=dict)
+    policy_version: Optional[int] = None
+    cached: bool = False
+
+
+class SafetyPipeline:
+    """
+    Runs every safety check over one normalised copy of the input, cheapest
+    first, and stops at the first decisive verdict:
+
+    1. ``input``       -- empty / over-length input (O(1))
+    2. ``self_harm``   -- self-harm phrases; answers with a crisis template
+    3. ``keywords``    -- guard keywords and runtime block-list (non-decisive, feeds risk)
+    4. ``threat_scan`` -- DivineShield's compiled policy matcher
+    5. ``risk``        -- RiskEvaluator over everything flagged so far; advisory
+                          only (logged and reported, never blocks), as before
+                          the pipeline existed
+    """
+
+    def __init__(
+        self,
+        shield: Optional[DivineShield] = None,
+        safeguard: Optional[SuicideSafeguard] = None,
+        risk_evaluator: Optional[RiskEvaluator] = None,
+        verdict_cache: Optional[VerdictCache[SafetyAssessment]] = None,
+    ) -> None:
+        self.shield = shield or DivineShield()
+        self.safeguard = safeguard or SuicideSafeguard()
+        self.risk_evaluator = risk_evaluator or RiskEvaluator()
+        self.verdicts = verdict_cache or VerdictCache("safety")
+        self.max_length = DivineShield.MAX_INPUT_LENGTH
+
+    def assess(self, text: str) -> SafetyAssessment:
+        """
+        Returns the verdict for ``text``. Repeats of a text already assessed
+        under the current policy version are answered from the verdict cache
+        (``cached=True``, with the lookup time as the only timing).
+        """
+        return self._assess(text, self.shield.policies.snapshot())
+
+    def assess_batch(self, texts: List[str]) -> List[SafetyAssessment]:
+        """
+        Verdicts for many texts in one pass under a single policy snapshot,
+        so a hot reload mid-batch cannot judge items by different rules.
+        """
+        snapshot = self.shield.policies.snapshot()
+        return [self._assess(text, snapshot) for text in texts]
+
+    def _assess(self, text: str, snapshot: PolicySnapshot) -> SafetyAssessment:
+        start = time.perf_counter()
+        cacheable = bool(text) and len(text) <= self.max_length
+        if cacheable:
+            hit = self.verdicts.lookup(text, snapshot.version)
+            if hit is not None:
+                return replace(
+                    hit,
+                    flagged=list(hit.flagged),
+                    timings_ms={"cache": round((time.perf_counter() - start) * 1000, 4)},
+                    cached=True,
+                )
+
+        verdict = self._run_stages(text, snapshot.matcher)
+        verdict.policy_version = snapshot.version
+        if cacheable:
+            self.verdicts.store(text, snapshot.version, replace(verdict, flagged=list(verdict.flagged)))
+        return verdict
+
+    def _run_stages(self, text: str, matcher: ThreatMatcher) -> SafetyAssessment:
+        timings: Dict[str, float] = {}
+        flagged: List[str] = []
+
+        def timed(stage: str, check: Callable[[], Optional[SafetyAssessment]]) -> Optional[SafetyAssessment]:
+            start = time.perf_counter()
+            verdict = check()
+            timings[stage] = round((time.perf_counter() - start) * 1000, 4)
+            return verdict
+
+        start = time.perf_counter()
+        norm = normalize_text(text or "")
+        timings["normalize"] = round((time.perf_counter() - start) * 1000, 4)
+
+        def check_input() -> Optional[SafetyAssessment]:
+            if not norm.normalized:
+                return SafetyAssessment(False, 1.0, "Empty input", "input", "high")
+            if len(text) > self.max_length:
+                return SafetyAssessment(False, 0.5, "Input too long", "input", "medium")
+            return None
+
+        def check_self_harm() -> Optional[SafetyAssessment]:
+            if self.safeguard.is_at_risk(norm.normalized):
+                return SafetyAssessment(
+                    False, 1.0, "Self-harm risk detected", "self_harm", "high", safe_reply=CRISIS_TEMPLATE
+                )
+            return None
+
+        def check_keywords() -> Optional[SafetyAssessment]:
+            flagged.extend(sorted(set(flagged_keywords(norm.normalized)) | set(blocked_terms(norm.normalized))))
+            return None
+
+        def check_threats() -> Optional[SafetyAssessment]:
+            pattern = matcher.first_match(norm.normalized)
+            if pattern is not None:
+                return SafetyAssessment(False, 0.9, f"Threat detected: {pattern}", "threat_scan", "high")
+            return None
+
+        def check_risk() -> Optional[SafetyAssessment]:
+            risk = self.risk_evaluator.score(flagged)
+            score, category = float(risk["score"]), str(risk["category"])
+            if category == "high":
+                logger.warning("High accumulated risk (%.2f) from flagged terms: %s", score, ", ".join(flagged))
+                return SafetyAssessment(True, score, "Accumulated risk high (advisory)", "risk", category)
+            return SafetyAssessment(True, score, "Safe", "risk", category)
+
+        for stage, check in (
+            ("input", check_input),
+            ("self_harm", check_self_harm),
+            ("keywords", check_keywords),
+            ("threat_scan", check_threats),
+            ("risk", check_risk),
+        ):
+            verdict = timed(stage, check)
+            if verdict is not None:
+                verdict.flagged = list(flagged)
+                verdict.timings_ms = timings
+                return verdict
+
+        raise AssertionError("risk stage always returns a verdict")  # pragma: no cover
@@ -0,0 +1,120 @@
+"""Single-pass matcher for DivineShield threat patterns."""
+from __future__ import annotations
+
+import logging
+import re
+from collections import deque
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NO_MATCH = 1 << 62
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+
+
+def literal_terms(pattern: str) -> Optional[List[str]]:
+    """
+    Returns the alternatives of a pattern that is only a literal alternation
+    such as ``(kill|suicide|die)``, or None if it uses any other regex syntax.
+    """
+    body = pattern
+    if body.startswith("(?:") and body.endswith(")"):
+        body = body[3:-1]
+    elif body.startswith("(") and body.endswith(")") and not body.startswith("(?"):
+        body = body[1:-1]
+    terms = body.split("|")
+    if any(not term or _REGEX_META.intersection(term) for term in terms):
+        return None
+    return terms
+
+
+class _AhoCorasick:
+    """Aho-Corasick automaton reporting the lowest pattern index found in a text."""
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [_NO_MATCH]
+
+    def add(self, term: str, index: int) -> None:
+        node = 0
+        for ch in term:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(_NO_MATCH)
+            node = nxt
+        self._best[node] = min(self._best[node], index)
+
+    def build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                # Inherit matches ending at the fail target (suffix terms)
+                self._best[child] = min(self._best[child], self._best[self._fail[child]])
+
+    def first_index(self, text: str) -> int:
+        goto, fail, best = self._goto, self._fail, self._best
+        node = 0
+        found = _NO_MATCH
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if best[node] < found:
+                found = best[node]
+                if found == 0:
+                    break
+        return found
+
+
+class ThreatMatcher:
+    """
+    Built once per policy version; ``first_match`` scans the text a single time.
+
+    Literal alternations (the common case in ``policies.json``) are merged
+    into one Aho-Corasick automaton, so scan cost does not grow with the
+    number of terms. Any other pattern is precompiled and only tried when it
+    could come before the best literal hit. The reported pattern is always
+    the first one in policy order that matches, same as the original loop.
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.patterns: Tuple[str, ...] = tuple(patterns)
+        self._literals = _AhoCorasick()
+        self._regexes: List[Tuple[int, Pattern[str]]] = []
+        for index, pattern in enumerate(self.patterns):
+            terms = literal_terms(pattern)
+            if terms is None:
+                try:
+                    self._regexes.append((index, re.compile(pattern)))
+                except re.error as exc:
+                    logger.error("Skipping invalid threat pattern %r: %s", pattern, exc)
+            else:
+                for term in terms:
+                    self._literals.add(term, index)
+        self._literals.build()
+
+    def first_match(self, lowered_text: str) -> Optional[str]:
+        """Returns the first policy pattern matching the (already lowercased) text."""
+        best = self._literals.first_index(lowered_text)
+        for index, regex in self._regexes:
+            if index >= best:
+                break
+            if regex.search(lowered_text):
+                best = index
+                break
+        return self.patterns[best] if best != _NO_MATCH else None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
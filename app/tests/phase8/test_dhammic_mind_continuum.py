@@ -9,7 +9,11 @@ from app.core.continuum.adaptive_continuum_memory import AdaptiveContinuumMemory
 from app.core.continuum.supervisor_mirror_protocol import SupervisorMirrorProtocol
 
 @pytest.mark.asyncio
-async def test_dhammic_mind_continuum_flow():
+async def test_dhammic_mind_continuum_flow(tmp_path, monkeypatch):
+    # Keep the timeline out of the checked-in continuum_runtime/ snapshot
+    monkeypatch.setattr(
+        "app.core.continuum.adaptive_continuum_memory.MEMORY_PATH", tmp_path / "continuum_memory.json"
+    )
     rse = ReflectiveSynchronyEngine()
     cgm = CollectiveGrowthMatrix()
     acm = AdaptiveContinuumMemory()
@@ -0,0 +1,74 @@
+"""Throughput of the emotion classifier: PyTorch pipeline vs. int8 ONNX Runtime.
+
+Usage: python -m benchmarks.bench_emotion_backends [--batch-sizes 1 8 16] [--threads 0]
+
+Needs transformers, torch and onnxruntime (the ONNX model is exported on first run).
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable, Sequence
+
+# Fixed corpus shared with the accuracy-parity test
+CORPUS = (
+    "I am so happy today, everything went well!",
+    "I feel sad and lonely tonight.",
+    "Why does nobody listen to me? This makes me furious.",
+    "I'm scared about the exam results tomorrow.",
+    "I love spending time with my family.",
+    "Thank you so much, you made my day.",
+    "I can't stop worrying about my health.",
+    "Everything feels pointless and heavy.",
+    "That was the best surprise party ever!",
+    "He lied to me again and I am angry.",
+    "I miss my grandmother every day.",
+    "The storm outside is terrifying.",
+    "My heart is full of gratitude and warmth.",
+    "I am calm and at peace after meditation.",
+    "Work is overwhelming and I feel anxious.",
+    "We finally adopted a puppy, I'm thrilled!",
+    "I feel betrayed by my closest friend.",
+    "Walking alone at night makes me nervous.",
+    "I adore the way you care for others.",
+    "Today was ordinary, nothing special happened.",
+)
+
+
+def throughput(classify: Callable[[Sequence[str]], Any], texts: Sequence[str], batch_size: int, rounds: int) -> float:
+    batches = [list(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)]
+    classify(batches[0])  # warm-up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for batch in batches:
+            classify(batch)
+    return rounds * len(texts) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    from transformers import pipeline
+
+    from app.emotion.neuro_empathic_mirror import EMOTION_MODEL_ID
+    from app.emotion.onnx_backend import OnnxEmotionClassifier
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 16])
+    parser.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op threads (0 = auto)")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--model-dir", default="models/emotion-onnx-int8")
+    args = parser.parse_args()
+
+    torch_pipe = pipeline("text-classification", model=EMOTION_MODEL_ID, top_k=None)
+    onnx_pipe = OnnxEmotionClassifier.from_pretrained(args.model_dir, EMOTION_MODEL_ID, intra_op_threads=args.threads)
+
+    for batch_size in args.batch_sizes:
+        torch_tps = throughput(lambda b: torch_pipe(b, batch_size=len(b)), CORPUS, batch_size, args.rounds)
+        onnx_tps = throughput(onnx_pipe, CORPUS, batch_size, args.rounds)
+        print(
+            f"batch {batch_size:>3} | pytorch {torch_tps:8.1f} texts/s | "
+            f"onnx-int8 {onnx_tps:8.1f} texts/s | speedup x{onnx_tps / torch_tps:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
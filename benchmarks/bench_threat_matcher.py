@@ -0,0 +1,79 @@
+"""Micro-benchmark: precompiled ThreatMatcher vs. the per-pattern re.search loop.
+
+Usage: python -m benchmarks.bench_threat_matcher [--sizes 1000 10000 100000]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import string
+import time
+
+from app.safety.threat_matcher import ThreatMatcher
+
+
+def make_patterns(count: int, regex_share: float = 0.01, seed: int = 13) -> list[str]:
+    rng = random.Random(seed)
+    patterns = []
+    for i in range(count):
+        if rng.random() < regex_share:
+            patterns.append(rf"(bad{i}\w+|evil{i}\s+plan)")
+        else:
+            terms = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10))) for _ in range(3)]
+            patterns.append("(" + "|".join(terms) + ")")
+    return patterns
+
+
+def make_texts(count: int, seed: int = 29) -> list[str]:
+    rng = random.Random(seed)
+    words = ["calm", "breath", "today", "family", "work", "ใจ", "สงบ", "ขอบคุณ", "mindful", "tired"]
+    return [" ".join(rng.choices(words, k=rng.randint(8, 60))) for _ in range(count)]
+
+
+def legacy_scan(patterns: list[str], text: str) -> str | None:
+    for pattern in patterns:
+        if re.search(pattern, text.lower()):
+            return pattern
+    return None
+
+
+def bench(size: int, texts: list[str], legacy_budget: int) -> None:
+    patterns = make_patterns(size)
+
+    start = time.perf_counter()
+    matcher = ThreatMatcher(patterns)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts:
+        matcher.first_match(text.lower())
+    compiled_us = (time.perf_counter() - start) / len(texts) * 1e6
+
+    sample = texts[:legacy_budget]
+    start = time.perf_counter()
+    for text in sample:
+        legacy_scan(patterns, text)
+    legacy_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    print(
+        f"{size:>7} patterns | build {build_s * 1000:8.1f} ms | "
+        f"matcher {compiled_us:9.1f} us/text | legacy loop {legacy_us:11.1f} us/text | "
+        f"speedup x{legacy_us / compiled_us:,.0f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--texts", type=int, default=500)
+    parser.add_argument("--legacy-texts", type=int, default=20, help="texts timed with the slow legacy loop")
+    args = parser.parse_args()
+
+    texts = make_texts(args.texts)
+    for size in args.sizes:
+        bench(size, texts, args.legacy_texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Startup import budget for ``main:app`` measured with ``python -X importtime``.
+
+Usage: python -m benchmarks.import_budget [--module main] [--budget-ms 2500] [--top 15]
+
+Exits non-zero when the cumulative import time exceeds the budget or when a
+heavy optional dependency is imported eagerly.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Optional dependencies that must only be imported on first use
+HEAVY_MODULES = (
+    "transformers",
+    "torch",
+    "sentence_transformers",
+    "chromadb",
+    "redis",
+    "onnxruntime",
+    "psutil",
+)
+DEFAULT_BUDGET_MS = float(os.getenv("NAMO_IMPORT_BUDGET_MS", "2500"))
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def measure(module: str = "main") -> list[ImportTiming]:
+    """Imports ``module`` in a fresh interpreter and parses the ``-X importtime`` report."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def total_ms(timings: list[ImportTiming], module: str = "main") -> float:
+    for timing in reversed(timings):
+        if timing.module == module:
+            return timing.cumulative_us / 1000
+    raise ValueError(f"{module} not found in importtime output")
+
+
+def eager_heavy_imports(timings: list[ImportTiming]) -> list[str]:
+    imported = {timing.module.split(".")[0] for timing in timings}
+    return sorted(imported.intersection(HEAVY_MODULES))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules (self time) to list")
+    args = parser.parse_args()
+
+    timings = measure(args.module)
+    elapsed = total_ms(timings, args.module)
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[: args.top]:
+        print(f"{timing.self_us / 1000:8.1f} ms  {timing.module}")
+    print(f"import {args.module}: {elapsed:.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    heavy = eager_heavy_imports(timings)
+    if heavy:
+        sys.exit(f"heavy optional modules imported at startup: {', '.join(heavy)}")
+    if elapsed > args.budget_ms:
+        sys.exit(f"import budget exceeded by {elapsed - args.budget_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,12 @@ from dataclasses import dataclass
 BLOCK_LIST = {"self-harm", "harm others", "violence"}
 
 
+def blocked_terms(lowered: str) -> list[str]:
+    """Block-list terms contained in already-lowercased text."""
+    return sorted(term for term in BLOCK_LIST if term in lowered)
+
+
 @dataclass
 class SafetyGuard:
     def assess(self, text: str) -> bool:
-        lowered = text.lower()
-        return not any(term in lowered for term in BLOCK_LIST)
+        return not blocked_terms(text.lower())
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from app.api.coalescing import SingleFlight, coalescing_key, parse_routes
+
+
+def _counting_call(calls):
+    release = asyncio.Event()
+
+    async def fn():
+        calls.append(1)
+        await release.wait()
+        return {"reply": len(calls)}
+
+    return fn, release
+
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_requests_share_one_run():
+    flight = SingleFlight(["/interact"])
+    calls = []
+    fn, release = _counting_call(calls)
+
+    waiters = [asyncio.ensure_future(flight.run("/interact", "u1", "Hello  there", fn)) for _ in range(3)]
+    waiters.append(asyncio.ensure_future(flight.run("/interact", "u1", "hello there", fn)))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["coalesced"] == 3
+    assert flight.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_distinct_users_are_never_coalesced():
+    flight = SingleFlight(["/interact"])
+    calls = []
+    fn, release = _counting_call(calls)
+
+    first = asyncio.ensure_future(flight.run("/interact", "u1", "hello", fn))
+    second = asyncio.ensure_future(flight.run("/interact", "u2", "hello", fn))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(first, second)
+
+    assert len(calls) == 2
+    assert coalescing_key("/interact", "u1", "hello") != coalescing_key("/interact", "u2", "hello")
+
+
+@pytest.mark.asyncio
+async def test_routes_not_configured_run_every_call():
+    flight = SingleFlight(parse_routes(""))
+    calls = []
+    fn, release = _counting_call(calls)
+    release.set()
+
+    await asyncio.gather(*(flight.run("/interact", "u1", "hello", fn) for _ in range(2)))
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_followers_see_the_leader_error_and_survive_its_cancellation():
+    flight = SingleFlight(["/interact"])
+    release = asyncio.Event()
+
+    async def broken():
+        await release.wait()
+        raise RuntimeError("model down")
+
+    leader = asyncio.ensure_future(flight.run("/interact", "u1", "hi", broken))
+    follower = asyncio.ensure_future(flight.run("/interact", "u1", "hi", broken))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    with pytest.raises(RuntimeError, match="model down"):
+        await follower
+    assert parse_routes(" /interact, /reflect ,") == frozenset({"/interact", "/reflect"})
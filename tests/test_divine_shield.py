@@ -0,0 +1,77 @@
+import json
+import random
+import re
+
+from app.core.policy_registry import PolicyRegistry
+from app.safety.divine_shield import DivineShield
+from app.safety.threat_matcher import ThreatMatcher, literal_terms
+
+
+def legacy_first_match(patterns, text):
+    for pattern in patterns:
+        if re.search(pattern, text.lower()):
+            return pattern
+    return None
+
+
+def test_literal_alternations_are_detected():
+    assert literal_terms("(kill|suicide|die)") == ["kill", "suicide", "die"]
+    assert literal_terms("(?:ignore previous|system prompt)") == ["ignore previous", "system prompt"]
+    assert literal_terms(r"(bad\w+)") is None
+    assert literal_terms("(a)|(b)") is None
+
+
+def test_matcher_agrees_with_legacy_loop():
+    patterns = [
+        "(kill|suicide|die|hurt)",
+        r"(over\s*ride|jail\w+)",
+        "(hate|destroy|idiot|stupid)",
+        "(ignore previous|system prompt)",
+        "die",
+        "(ฆ่า|ตาย)",
+    ]
+    vocab = ["i", "feel", "die", "hated", "override", "over ride", "jailbreak", "calm",
+             "system", "prompt", "system prompt", "ฆ่า", "สงบ", "studied", "Kill"]
+    rng = random.Random(3)
+    matcher = ThreatMatcher(patterns)
+    for _ in range(2000):
+        text = " ".join(rng.choices(vocab, k=rng.randint(1, 8)))
+        assert matcher.first_match(text.lower()) == legacy_first_match(patterns, text), text
+
+
+def test_protect_reports_first_pattern_in_policy_order():
+    shield = DivineShield()
+    assessment = shield.protect("you idiot, I will kill it")
+    assert not assessment.is_safe
+    assert assessment.reason == "Threat detected: (kill|suicide|die|hurt)"
+
+
+def test_length_check_short_circuits_before_scanning():
+    shield = DivineShield()
+    assessment = shield.protect("kill " * 500)
+    assert assessment.reason == "Input too long"
+    assert shield.protect("hello friend").is_safe
+
+
+def test_reload_swaps_matcher(tmp_path):
+    policy_path = tmp_path / "policies.json"
+    policy_path.write_text(json.dumps({"threat_patterns": ["(kill)"]}), encoding="utf-8")
+    shield = DivineShield(policy_registry=PolicyRegistry(path=policy_path))
+    assert shield.protect("pineapple").is_safe
+    policy_path.write_text(json.dumps({"threat_patterns": ["(pineapple)"]}), encoding="utf-8")
+    shield.reload_policies()
+    assert shield.threat_patterns == ("(pineapple)",)
+    assert not shield.protect("I love PINEAPPLE").is_safe
+
+
+def test_protect_caches_verdicts_per_policy_version(tmp_path):
+    policy_path = tmp_path / "policies.json"
+    policy_path.write_text(json.dumps({"threat_patterns": ["(kill)"]}), encoding="utf-8")
+    shield = DivineShield(policy_registry=PolicyRegistry(path=policy_path))
+    assert shield.protect("hello").is_safe
+    assert shield.protect("hello").is_safe
+    assert shield.verdicts.stats()["hits"] == 1
+
+    policy_path.write_text(json.dumps({"threat_patterns": ["(hello)"]}), encoding="utf-8")
+    shield.reload_policies()
+    assert not shield.protect("hello").is_safe
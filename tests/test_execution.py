@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.execution import ExecutionStage, StageExecutor, StageOverloadedError
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_runs_off_the_event_loop():
+    stage = ExecutionStage("test", max_workers=2, max_queue=2)
+    loop_thread = threading.get_ident()
+    worker_thread = await stage.run(threading.get_ident)
+    assert worker_thread != loop_thread
+    assert stage.stats()["completed"] == 1
+    stage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_overloaded_stage_rejects_new_work():
+    stage = ExecutionStage("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    first = asyncio.ensure_future(stage.run(release.wait, 2))
+    second = asyncio.ensure_future(stage.run(release.wait, 2))
+    await asyncio.sleep(0)
+
+    with pytest.raises(StageOverloadedError) as excinfo:
+        await stage.run(release.wait, 2)
+    assert excinfo.value.stage == "test"
+
+    release.set()
+    await asyncio.gather(first, second)
+    stats = stage.stats()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+    stage.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_stage_is_reusable_after_shutdown():
+    executor = StageExecutor()
+    assert await executor.run("io", sum, [1, 2, 3]) == 6
+    executor.shutdown()
+    assert await executor.run("io", sum, [4, 5]) == 9
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_keeps_its_slot_until_the_worker_finishes():
+    stage = ExecutionStage("test", max_workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        release.wait(2)
+
+    task = asyncio.ensure_future(stage.run(work))
+    await asyncio.to_thread(started.wait, 2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The thread is still busy, so admission must still count it
+    assert stage.stats()["in_flight"] == 1
+    with pytest.raises(StageOverloadedError):
+        await stage.run(sum, [1])
+
+    release.set()
+    stage.shutdown(wait=True)
+    assert stage.stats()["in_flight"] == 0
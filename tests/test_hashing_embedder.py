@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+import numpy as np
+
+from app.memory.hashing_embedder import HashingEmbedder
+from app.memory.infinity_memory import InfinityMemorySystem
+
+
+def test_encode_shapes_and_dtype():
+    embedder = HashingEmbedder()
+    single = embedder.encode("hello")
+    batch = embedder.encode(["hello", "world"])
+    assert single.shape == (384,) and single.dtype == np.float32
+    assert batch.shape == (2, 384) and batch.dtype == np.float32
+    assert np.allclose(np.linalg.norm(batch, axis=1), 1.0)
+
+
+def test_batch_matches_single_encoding():
+    embedder = HashingEmbedder()
+    texts = ["ฉันรู้สึกเศร้า", "I feel calm", "a"]
+    batch = embedder.encode(texts)
+    for row, text in zip(batch, texts):
+        assert np.array_equal(row, embedder.encode(text))
+
+
+def test_deterministic_across_processes():
+    code = (
+        "from app.memory.hashing_embedder import HashingEmbedder;"
+        "print(HashingEmbedder().encode('สวัสดีครับ').tobytes().hex())"
+    )
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        for _ in range(2)
+    }
+    assert len(outputs) == 1
+    assert bytes.fromhex(outputs.pop().strip()) == HashingEmbedder().encode("สวัสดีครับ").tobytes()
+
+
+def test_similar_thai_texts_are_closer_than_unrelated():
+    embedder = HashingEmbedder()
+    sad, sadder, weather = embedder.encode(["ฉันรู้สึกเศร้า", "ฉันรู้สึกเศร้ามาก", "วันนี้อากาศดี"])
+    assert sad @ sadder > sad @ weather
+
+
+def test_normalization_ignores_case_width_and_zero_width_chars():
+    embedder = HashingEmbedder()
+    assert np.array_equal(embedder.encode("Hello  World"), embedder.encode("hello world\u200b"))
+
+
+def test_memory_system_uses_hashing_backend_when_selected(tmp_path):
+    memory = InfinityMemorySystem(db_path=str(tmp_path / "chroma"))
+    memory.settings = memory.settings.model_copy(update={"EMBEDDER_BACKEND": "hashing"})
+    memory.embedder = memory._init_embedder()
+    assert isinstance(memory.embedder, HashingEmbedder)
+    assert memory.embed("same text") == memory.embed("same text")
+    assert len(memory.embed("same text")) == 384
@@ -22,3 +22,115 @@ def test_reflect_endpoint_basic():
     payload = response.json()
     assert "reflection_text" in payload
     assert "tone" in payload
+
+
+def test_interact_returns_503_when_stage_is_overloaded():
+    from unittest.mock import patch
+
+    from app.core.execution import StageOverloadedError
+
+    with patch("app.api.gateway.persona.process", side_effect=StageOverloadedError("model")):
+        response = client.post("/interact", json={"message": "hello"})
+    assert response.status_code == 503
+    assert response.json()["stage"] == "model"
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_interact_does_not_block_on_keyword_risk_alone():
+    # Several flagged keywords but no threat pattern: the risk stage is advisory
+    response = client.post("/interact", json={"message": "A movie about violence, a weapon and an attack."})
+    assert response.status_code == 200
+    assert response.json().get("status") != "blocked"
+    assert response.json()["reflection_text"]
+
+
+def test_readyz_reports_per_component_warmup_and_serves_degraded():
+    from unittest.mock import patch
+
+    from app.core.warmup import WarmupManager
+
+    manager = WarmupManager()
+    manager.register("emotion_model", lambda: None, lambda _: None)
+    with patch("app.api.gateway.warmup", manager):
+        response = client.get("/readyz")
+        assert response.status_code == 503
+        assert response.json()["components"]["emotion_model"]["state"] == "pending"
+
+        # Requests are still answered (simulation mode) while warming up
+        reply = client.post("/interact", json={"message": "I feel calm today."})
+        assert reply.status_code == 200
+        assert reply.json()["meta_data"]["degraded"] is True
+
+        manager.warm_all()
+        response = client.get("/readyz")
+        assert response.status_code == 200
+        assert response.json()["status"] == "ready"
+
+
+def test_status_reports_model_budget_decisions():
+    payload = client.get("/api/status").json()
+    assert payload["status"] == "online"
+    assert {"budget_mb", "allocated_mb", "remaining_mb", "components"} <= set(payload["models"])
+    # None while the memory system is still warming up
+    memory = payload["memory"]
+    assert memory is None or memory["collection"].startswith("namo_infinity_memories")
+
+
+def test_interact_stream_emits_partial_results_as_ndjson():
+    import json
+
+    response = client.post("/interact/stream", json={"message": "I feel happy and calm today."})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert {event["event"] for event in events[:2]} == {"empathy", "memory"}
+    assert [event["event"] for event in events[2:]] == ["reflection", "done"]
+    empathy = next(event for event in events if event["event"] == "empathy")
+    done = events[-1]
+    assert done["reflection_text"].startswith(empathy["response_text"])
+    assert "meta_data" in done
+
+
+def test_interact_stream_reports_blocked_input_in_band():
+    import json
+
+    response = client.post("/interact/stream", json={"message": "I want to kill myself"})
+    events = [json.loads(line) for line in response.text.splitlines() if line]
+    assert len(events) == 1
+    assert events[0]["event"] == "blocked"
+    assert events[0]["status"] == "blocked"
+
+
+def test_metrics_endpoint_exposes_stage_histograms():
+    client.post("/interact", json={"message": "I feel calm today."})
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE namo_stage_latency_seconds histogram" in body
+    for stage in ("shield", "emotion", "reflection"):
+        assert f'namo_stage_latency_seconds_count{{stage="{stage}"}}' in body
+    assert 'namo_stage_latency_seconds_quantile{stage="shield",quantile="0.99"}' in body
+
+
+def test_interact_batch_returns_per_item_status_in_order():
+    response = client.post(
+        "/interact/batch",
+        json={
+            "items": [
+                {"user_id": "a", "message": "I feel calm today."},
+                {"user_id": "b", "message": "I want to kill myself"},
+                {"user_id": "a", "message": "Thank you for listening."},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["count"] == 3 and payload["blocked"] == 1
+    assert [item["index"] for item in payload["results"]] == [0, 1, 2]
+    assert [item["status"] for item in payload["results"]] == ["ok", "blocked", "ok"]
+    assert payload["results"][0]["reflection_text"]
+    assert payload["results"][2]["user"] == "a"
+    assert "reflection" in payload["results"][0]["meta_data"]["stage_timings_ms"]
+
+    assert client.post("/interact/batch", json={"items": []}).status_code == 422
@@ -0,0 +1,27 @@
+import sys
+
+import pytest
+
+from app.core.lazy_import import lazy_import
+from benchmarks.import_budget import DEFAULT_BUDGET_MS, eager_heavy_imports, measure, total_ms
+
+
+def test_main_import_stays_within_budget():
+    timings = measure("main")
+    # Optional heavy dependencies must load on first use, never at import time
+    assert eager_heavy_imports(timings) == []
+    assert total_ms(timings, "main") < DEFAULT_BUDGET_MS
+
+
+def test_lazy_module_imports_on_first_use():
+    sys.modules.pop("colorsys", None)
+    colorsys = lazy_import("colorsys")
+    assert colorsys.available and not colorsys.loaded
+    assert "colorsys" not in sys.modules
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+    assert colorsys.loaded
+
+    missing = lazy_import("namo_not_installed_module")
+    assert not missing.available
+    with pytest.raises(ImportError):
+        missing.anything
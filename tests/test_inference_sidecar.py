@@ -0,0 +1,168 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.emotion.neuro_empathic_mirror import NeuroEmpathicMirror
+from app.inference.sidecar import (
+    InferenceServer,
+    RemoteEmbedder,
+    RemoteEmotionAnalyzer,
+    SidecarClient,
+    SidecarError,
+    connect,
+    write_frame,
+)
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets required")
+
+
+def fake_classify(texts):
+    return [[{"label": "joy", "score": 0.9 if "happy" in text else 0.2}] for text in texts]
+
+
+def fake_embed(texts):
+    return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+
+@pytest.fixture
+def server():
+    # AF_UNIX paths are limited to ~100 bytes, so avoid pytest's long tmp_path
+    socket_dir = tempfile.mkdtemp(prefix="namo-")
+    calls = []
+
+    def classify(texts):
+        calls.append(len(texts))
+        return fake_classify(texts)
+
+    srv = InferenceServer(
+        os.path.join(socket_dir, "s.sock"),
+        {"classify": classify, "embed": fake_embed},
+        max_batch_size=32,
+        max_wait_ms=20.0,
+        variants={"embed": "hashing"},
+    ).start()
+    srv.calls = calls
+    yield srv
+    srv.close()
+    os.rmdir(socket_dir)
+
+
+def test_requests_from_many_clients_share_batches(server):
+    results = {}
+
+    def worker(i):
+        client = SidecarClient(server.socket_path)
+        results[i] = RemoteEmotionAnalyzer(client)(f"happy {i}" if i % 2 else f"calm {i}")
+        client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [results[i][0][0]["score"] for i in range(16)] == [0.9 if i % 2 else 0.2 for i in range(16)]
+    # 16 single-text requests from separate connections, far fewer forward passes
+    assert sum(server.calls) == 16
+    assert len(server.calls) < 16
+    assert server.stats()["classify"]["items"] == 16
+
+
+def test_remote_embedder_matches_encode_shapes(server):
+    embedder = RemoteEmbedder(SidecarClient(server.socket_path))
+    single = embedder.encode("abcd")
+    batch = embedder.encode(["a", "abc"])
+    assert single.shape == (3,) and single.dtype == np.float32
+    assert single[0] == 4.0
+    assert batch.shape == (2, 3)
+
+
+def test_errors_and_unknown_ops_surface_as_sidecar_errors(server):
+    client = SidecarClient(server.socket_path)
+    assert client.ops() == ["classify", "embed"]
+    assert client.variants() == {"embed": "hashing"}
+    with pytest.raises(SidecarError, match="unsupported op"):
+        client.call("translate", ["x"])
+    assert connect(server.socket_path, "translate") is None
+    assert SidecarClient("/nonexistent/namo.sock").ops() == []
+
+
+def test_mirror_uses_sidecar_when_configured(server):
+    with patch("app.emotion.neuro_empathic_mirror.get_settings") as settings:
+        settings.return_value.INFERENCE_SOCKET = server.socket_path
+        settings.return_value.EMOTION_BATCH_MAX_SIZE = 1
+        mirror = NeuroEmpathicMirror()
+    assert isinstance(mirror.analyzer, RemoteEmotionAnalyzer)
+    assert mirror.analyze_emotion_depth("so happy")["joy"] == 0.9
+
+
+def test_mirror_falls_back_in_process_when_sidecar_is_down():
+    with patch("app.emotion.neuro_empathic_mirror.get_settings") as settings, \
+            patch("app.emotion.neuro_empathic_mirror.HAS_TRANSFORMERS", False):
+        settings.return_value.INFERENCE_SOCKET = "/nonexistent/namo.sock"
+        mirror = NeuroEmpathicMirror()
+    assert mirror.analyzer is None
+    assert mirror.reflect("I am happy").emotional_matching_score == 0.8
+
+
+def test_hung_model_call_times_out_with_an_error_response():
+    socket_dir = tempfile.mkdtemp(prefix="namo-")
+    release = threading.Event()
+
+    def hung(texts):
+        release.wait(5)
+        return [[] for _ in texts]
+
+    srv = InferenceServer(os.path.join(socket_dir, "s.sock"), {"classify": hung}, request_timeout_s=0.1).start()
+    try:
+        response = srv.dispatch({"op": "classify", "texts": ["x"]})
+        assert response["ok"] is False
+        assert "timed out" in response["error"]
+    finally:
+        release.set()
+        srv.close()
+
+
+def test_hung_call_is_submitted_once_and_reports_the_server_timeout():
+    socket_dir = tempfile.mkdtemp(prefix="namo-")
+    release = threading.Event()
+    batches = []
+
+    def hung(texts):
+        batches.append(list(texts))
+        release.wait(5)
+        return [[] for _ in texts]
+
+    srv = InferenceServer(os.path.join(socket_dir, "s.sock"), {"classify": hung}, request_timeout_s=0.1).start()
+    try:
+        # The server deadline fires first and its error reply reaches the client
+        with pytest.raises(SidecarError, match="timed out after 0.1s"):
+            SidecarClient(srv.socket_path).call("classify", ["x"])
+        # A client-side socket timeout is not retried either
+        with pytest.raises(SidecarError):
+            SidecarClient(srv.socket_path, timeout=0.05).call("classify", ["y"])
+        time.sleep(0.05)
+        assert batches == [["x"]]
+        assert srv.batchers["classify"].stats()["queue_depth"] == 1
+    finally:
+        release.set()
+        srv.close()
+        os.rmdir(socket_dir)
+
+
+def test_client_disconnect_mid_request_closes_quietly(server):
+    with patch.object(server._server, "handle_error") as handle_error:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(server.socket_path)
+        write_frame(sock, {"op": "embed", "texts": ["a" * 1000] * 50})
+        sock.close()
+        # The handler's reply hits a broken pipe; the server keeps serving others
+        assert SidecarClient(server.socket_path).call("embed", ["ab"]) == [[2.0, 1.0, 0.0]]
+        time.sleep(0.1)
+    handle_error.assert_not_called()
@@ -0,0 +1,196 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from app.core.ttl_cache import content_hash
+from app.memory.hashing_embedder import HashingEmbedder
+from app.memory.infinity_memory import InfinityMemorySystem, collection_name, embedder_variant
+
+
+@pytest.fixture
+def memory(tmp_path):
+    system = InfinityMemorySystem(db_path=str(tmp_path / "chroma"))
+    system.embedder = MagicMock()
+    system.embedder.encode.side_effect = lambda text: np.ones(384) * len(text)
+    system.vector_db = MagicMock()
+    system.vector_db.query.return_value = {"documents": [["past"]], "metadatas": [[{"intensity": 0.5}]]}
+    return system
+
+
+def test_embed_is_cached_by_content(memory):
+    first = memory.embed("hello")
+    second = memory.embed("hello")
+    assert first == second
+    assert memory.embedder.encode.call_count == 1
+    assert memory.embedding_cache.stats()["hits"] == 1
+
+
+def test_remember_and_recall_encodes_once(memory):
+    context = memory.remember_and_recall("I feel calm", {"coherence": 0.7})
+
+    assert context == ["past"]
+    assert memory.embedder.encode.call_count == 1
+    stored_vec = memory.vector_db.upsert.call_args.kwargs["embeddings"][0]
+    query_vec = memory.vector_db.query.call_args.kwargs["query_embeddings"][0]
+    assert stored_vec == query_vec
+
+
+def test_store_and_retrieve_accept_precomputed_embedding(memory):
+    vector = [0.5] * 384
+    memory.store_memory("text", {"coherence": 0.4}, embedding=vector)
+    memory.retrieve_context("text", {"coherence": 0.4}, embedding=vector)
+    memory.embedder.encode.assert_not_called()
+
+
+def test_hot_tier_answers_without_chroma_once_it_holds_k_turns(memory):
+    for text in ["first", "second", "third"]:
+        memory.store_memory(text, {"coherence": 0.6}, user_id="u1")
+
+    context = memory.retrieve_context("second", {"coherence": 0.6}, k=3, user_id="u1")
+
+    assert sorted(context) == ["first", "second", "third"]
+    memory.vector_db.query.assert_not_called()
+    assert memory.hot_tier.stats()["hits"] == 1
+
+
+def test_hot_tier_miss_falls_back_to_chroma(memory):
+    memory.store_memory("only one", {"coherence": 0.6}, user_id="u2")
+
+    context = memory.retrieve_context("only one", {"coherence": 0.6}, k=3, user_id="u2")
+
+    assert context == ["past"]
+    memory.vector_db.query.assert_called_once()
+    assert memory.hot_tier.stats()["misses"] == 1
+
+
+def test_hot_tier_is_per_user(memory):
+    for text in ["a", "b", "c"]:
+        memory.store_memory(text, {"coherence": 0.6}, user_id="alice")
+    memory.retrieve_context("a", {"coherence": 0.6}, k=3, user_id="bob")
+    assert memory.hot_tier.stats()["misses"] == 1
+
+
+def test_store_memory_goes_through_write_behind_buffer(memory):
+    memory.write_buffer = memory._init_write_buffer()
+    for text in ["one", "two", "three"]:
+        memory.store_memory(text, {"coherence": 0.5})
+    memory.close()
+
+    added = [doc for call in memory.vector_db.upsert.call_args_list for doc in call.kwargs["documents"]]
+    assert added == ["one", "two", "three"]
+    assert memory.vector_db.upsert.call_count < 3
+    assert memory.write_stats()["flushed"] == 3
+
+    # After shutdown, writes fall back to inline inserts
+    memory.store_memory("four", {"coherence": 0.5})
+    assert memory.vector_db.upsert.call_args.kwargs["documents"] == ["four"]
+
+
+def test_replayed_memory_is_upserted_under_the_same_id(memory):
+    memory.store_memory("retry me", {"coherence": 0.5}, user_id="u1")
+    memory.store_memory("retry me", {"coherence": 0.5}, user_id="u1")
+
+    ids = [call.kwargs["ids"][0] for call in memory.vector_db.upsert.call_args_list]
+    assert len(ids) == 2 and ids[0] == ids[1]
+    assert len(memory.hot_tier.recent("u1")) == 1
+
+
+def test_memories_are_tagged_and_queried_per_user(memory):
+    memory.store_memory("alice secret", {"coherence": 0.5}, user_id="alice")
+    assert memory.vector_db.upsert.call_args.kwargs["metadatas"][0]["user_id"] == "alice"
+
+    memory.retrieve_context("anything", {"coherence": 0.5}, user_id="bob")
+    assert memory.vector_db.query.call_args.kwargs["where"] == {"user_id": "bob"}
+
+
+def test_overfetch_queries_k_times_factor_and_returns_k(memory):
+    memory.settings = memory.settings.model_copy(update={"MEMORY_OVERFETCH_FACTOR": 3})
+    memory.vector_db.query.return_value = {
+        "documents": [["a", "b", "c", "d", "e", "f"]],
+        "metadatas": [[{"intensity": 0.5}] * 6],
+        "embeddings": [[[1.0, 0.0]] * 6],
+    }
+
+    context = memory.retrieve_context("q", {}, k=2, embedding=[1.0, 0.0], user_id="fresh")
+
+    assert len(context) == 2
+    kwargs = memory.vector_db.query.call_args.kwargs
+    assert kwargs["n_results"] == 6
+    assert "embeddings" in kwargs["include"]
+
+
+def test_batch_embeds_once_and_queries_once_per_user(memory):
+    memory.embedder.encode.side_effect = lambda texts: np.ones((len(texts), 384))
+    texts = ["a", "b", "a", "c"]
+    vectors = memory.embed_batch(texts)
+    assert memory.embedder.encode.call_count == 1
+    assert memory.embedder.encode.call_args.args[0] == ["a", "b", "c"]
+    assert vectors[0] == vectors[2]
+
+    memory.vector_db.query.return_value = {
+        "documents": [["x"], ["y"]],
+        "metadatas": [[{"intensity": 0.5}], [{"intensity": 0.5}]],
+    }
+    contexts = memory.retrieve_context_batch(texts, vectors, ["u1", "u2", "u1", "u3"])
+
+    assert memory.vector_db.query.call_count == 3
+    first_call = memory.vector_db.query.call_args_list[0].kwargs
+    assert first_call["where"] == {"user_id": "u1"} and len(first_call["query_embeddings"]) == 2
+    assert contexts[0] == ["x"] and contexts[2] == ["y"]
+
+
+def test_store_memories_issues_one_bulk_upsert(memory):
+    stored = memory.store_memories(["a", "b"], [{"coherence": 0.5}] * 2, [[0.1] * 384] * 2, ["u1", "u2"])
+
+    assert stored == 2
+    memory.vector_db.upsert.assert_called_once()
+    assert memory.vector_db.upsert.call_args.kwargs["documents"] == ["a", "b"]
+    assert [turn["text"] for turn in memory.hot_tier.recent("u2")] == ["b"]
+
+
+def test_encoder_failure_is_neither_cached_nor_persisted(memory):
+    memory.embedder.encode.side_effect = RuntimeError("cuda oom")
+
+    vector = memory.embed("hello")
+    assert len(vector) == 384
+    assert memory.embedding_cache.get(content_hash("hello")) is None
+    assert memory.retrieve_context("hello", embedding=vector, user_id="u1") == []
+
+    memory.store_memory("hello", {"coherence": 0.5}, embedding=vector, user_id="u1")
+    memory.flush()
+    memory.vector_db.upsert.assert_not_called()
+    assert memory.hot_tier.recent("u1") == []
+    assert memory.write_stats()["skipped_fallback_writes"] == 1
+
+
+def test_fallback_vector_is_replaced_when_the_encoder_recovers(memory):
+    memory.embedder.encode.side_effect = RuntimeError("transient")
+    vector = memory.embed("hello")
+
+    memory.embedder.encode.side_effect = lambda text: np.full(384, 2.0)
+    memory.store_memory("hello", {"coherence": 0.5}, embedding=vector, user_id="u1")
+    memory.flush()
+    assert memory.vector_db.upsert.call_args.kwargs["embeddings"][0] == [2.0] * 384
+
+
+def test_failed_batch_encode_is_neither_cached_nor_persisted(memory):
+    memory.embedder.encode.side_effect = RuntimeError("sidecar down")
+
+    vectors = memory.embed_batch(["a", "b"])
+    assert memory.embedding_cache.get(content_hash("a")) is None
+    assert memory.retrieve_context_batch(["a", "b"], vectors, ["u1", "u1"]) == [[], []]
+
+    assert memory.store_memories(["a", "b"], [{"coherence": 0.5}] * 2, vectors, ["u1", "u1"]) == 0
+    memory.vector_db.upsert.assert_not_called()
+    memory.vector_db.query.assert_not_called()
+    assert memory.write_stats()["skipped_fallback_writes"] == 2
+
+
+def test_each_embedder_variant_gets_its_own_collection():
+    assert embedder_variant(HashingEmbedder()) == "hashing"
+    assert embedder_variant(MagicMock(spec=["encode"])) == "minilm"
+    assert embedder_variant(MagicMock(variant="hashing")) == "hashing"
+    # MiniLM keeps the original collection, so existing memories stay readable
+    assert collection_name("minilm") == "namo_infinity_memories"
+    assert collection_name("hashing") == "namo_infinity_memories_hashing"
@@ -0,0 +1,69 @@
+import logging
+import logging.handlers
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import logging_middleware
+from app.core.logging_middleware import LoggingMiddleware, next_request_id
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(LoggingMiddleware)
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a\n", b"b\n"]), media_type="text/plain")
+
+    return app
+
+
+def test_request_ids_are_unique_and_returned(caplog):
+    client = TestClient(_app())
+    with caplog.at_level(logging.INFO, logger="app.core.logging_middleware"):
+        first = client.get("/ping")
+        second = client.get("/ping")
+
+    assert first.status_code == 200
+    assert first.headers["X-Request-ID"] != second.headers["X-Request-ID"]
+    messages = [record.getMessage() for record in caplog.records]
+    assert any("GET /ping -> 200" in message and first.headers["X-Request-ID"] in message for message in messages)
+
+
+def test_streaming_responses_pass_through():
+    response = TestClient(_app()).get("/stream")
+    assert response.text == "a\nb\n"
+    assert "X-Request-ID" in response.headers
+
+
+def test_request_id_shares_a_process_prefix():
+    first, second = next_request_id(), next_request_id()
+    assert first.split("-")[0] == second.split("-")[0]
+    assert int(second.split("-")[1], 16) > int(first.split("-")[1], 16)
+
+
+def test_setup_logging_routes_records_through_a_queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    root.handlers = []
+    try:
+        logging_middleware.setup_logging()
+        assert [type(handler) for handler in root.handlers] == [logging.handlers.QueueHandler]
+
+        logging.getLogger("namo.test").warning("queued record")
+        logging_middleware.shutdown_logging()
+
+        assert "queued record" in (tmp_path / "logs" / "namo_requests.log").read_text()
+        assert not any(isinstance(handler, logging.handlers.QueueHandler) for handler in root.handlers)
+    finally:
+        for handler in root.handlers:
+            handler.close()
+        root.handlers = saved_handlers
+        root.setLevel(saved_level)
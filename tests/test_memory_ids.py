@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.memory.memory_ids import MemoryIdAssigner, MemoryIdGenerator, idempotency_key
+
+
+def test_ids_are_unique_and_monotonic_within_a_millisecond():
+    generator = MemoryIdGenerator(node_id="N0DE")
+    ids = [generator.new_id(now_ms=1_700_000_000_000) for _ in range(1000)]
+    assert len(set(ids)) == 1000
+    assert ids == sorted(ids)
+
+
+def test_ids_sort_by_time_and_share_time_prefix():
+    generator = MemoryIdGenerator(node_id="N0DE")
+    early = generator.new_id(now_ms=1_000)
+    late = generator.new_id(now_ms=2_000)
+    assert early < late
+    assert late.startswith(MemoryIdGenerator.time_prefix(2_000))
+    assert MemoryIdGenerator.time_prefix(1_500) < late
+
+
+def test_concurrent_generation_never_collides():
+    generator = MemoryIdGenerator()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        ids = list(pool.map(lambda _: generator.new_id(), range(2000)))
+    assert len(set(ids)) == 2000
+
+
+def test_invalid_node_id_is_rejected():
+    with pytest.raises(ValueError):
+        MemoryIdGenerator(node_id="toolong")
+
+
+def test_assigner_reuses_id_for_replays_only():
+    assigner = MemoryIdAssigner(MemoryIdGenerator(node_id="N0DE"), window_seconds=60)
+    first = assigner.assign("alice", "hello")
+    assert assigner.assign("alice", "hello") == first
+    assert assigner.assign("bob", "hello") != first
+    assert assigner.assign("alice", "hello again") != first
+    assert idempotency_key("alice", "hello") != idempotency_key("bob", "hello")
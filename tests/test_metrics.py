@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from app.core.metrics import LatencyHistogram, MetricsRegistry
+
+
+def test_quantiles_are_interpolated_within_buckets():
+    histogram = LatencyHistogram("stage", buckets=(0.01, 0.02, 0.04))
+    for _ in range(90):
+        histogram.observe(0.005)
+    for _ in range(10):
+        histogram.observe(0.03)
+
+    stats = histogram.stats()
+    assert stats["count"] == 100
+    assert stats["p50_ms"] == pytest.approx(50 / 90 * 10, rel=1e-3)
+    assert 20 <= stats["p95_ms"] <= 40
+    assert LatencyHistogram("empty").stats()["p99_ms"] is None
+
+
+def test_observations_from_many_threads_are_all_counted():
+    histogram = LatencyHistogram("stage")
+
+    def record():
+        for _ in range(1000):
+            histogram.observe(0.001)
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts, total = histogram.snapshot()
+    assert sum(counts) == 8000
+    assert total == pytest.approx(8.0)
+
+
+def test_span_records_even_when_the_block_raises():
+    registry = MetricsRegistry()
+    with registry.span("ok"):
+        pass
+    with pytest.raises(RuntimeError):
+        with registry.span("broken"):
+            raise RuntimeError("boom")
+
+    stats = registry.stats()
+    assert stats["ok"]["count"] == 1
+    assert stats["broken"]["count"] == 1
+
+
+def test_prometheus_rendering_is_cumulative():
+    registry = MetricsRegistry(buckets=(0.01, 0.1))
+    histogram = registry.histogram("emotion")
+    histogram.observe(0.005)
+    histogram.observe(0.05)
+    histogram.observe(5.0)
+
+    lines = registry.render_prometheus().splitlines()
+    assert 'namo_stage_latency_seconds_bucket{stage="emotion",le="0.01"} 1' in lines
+    assert 'namo_stage_latency_seconds_bucket{stage="emotion",le="0.1"} 2' in lines
+    assert 'namo_stage_latency_seconds_bucket{stage="emotion",le="+Inf"} 3' in lines
+    assert 'namo_stage_latency_seconds_count{stage="emotion"} 3' in lines
+    assert any(line.startswith('namo_stage_latency_seconds_quantile{stage="emotion",quantile="0.5"}') for line in lines)
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.emotion.micro_batcher import MicroBatcher
+
+
+def test_results_fan_out_to_each_caller():
+    calls = []
+
+    def batch_fn(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(batcher, [f"msg{i}" for i in range(8)]))
+    finally:
+        batcher.close()
+
+    assert results == [f"MSG{i}" for i in range(8)]
+    # Concurrent callers are coalesced into fewer forward passes than requests.
+    assert len(calls) < 8
+    assert sum(len(batch) for batch in calls) == 8
+
+
+def test_batch_size_is_capped():
+    gate = threading.Event()
+    sizes = []
+
+    def batch_fn(texts):
+        gate.wait(1.0)
+        sizes.append(len(texts))
+        return texts
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=20)
+    futures = [batcher.submit(str(i)) for i in range(7)]
+    gate.set()
+    assert [f.result(timeout=2) for f in futures] == [str(i) for i in range(7)]
+    batcher.close()
+
+    assert max(sizes) <= 3
+    stats = batcher.stats()
+    assert stats["items"] == 7
+    assert stats["queue_depth"] == 0
+    assert sum(stats["batch_size_histogram"].values()) == stats["batches"]
+
+
+def test_batch_failure_propagates_to_callers():
+    def batch_fn(texts):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+    future = batcher.submit("hello")
+    with pytest.raises(ValueError):
+        future.result(timeout=2)
+    batcher.close()
+
+
+def test_submit_after_close_is_rejected():
+    batcher = MicroBatcher(lambda texts: texts)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
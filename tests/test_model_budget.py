@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from app.core.model_budget import EMBEDDER, EMOTION_CLASSIFIER, ModelBudget
+from app.emotion.neuro_empathic_mirror import NeuroEmpathicMirror
+
+
+def test_preferred_variants_load_when_they_fit():
+    budget = ModelBudget(2048)
+    assert budget.allocate(EMOTION_CLASSIFIER).name == "pytorch"
+    assert budget.allocate(EMBEDDER).name == "minilm"
+    stats = budget.stats()
+    assert stats["allocated_mb"] == 1000
+    assert stats["remaining_mb"] == 1048
+    assert stats["components"][EMOTION_CLASSIFIER]["variant"] == "pytorch"
+
+
+def test_tight_budget_picks_quantized_variant_before_simulation():
+    budget = ModelBudget(600)
+    assert budget.allocate(EMBEDDER).name == "minilm"  # 300 MB, 300 left
+    variant = budget.allocate(EMOTION_CLASSIFIER)
+    assert variant.name == "onnx-int8"
+    assert "pytorch over budget" in budget.stats()["components"][EMOTION_CLASSIFIER]["reason"]
+
+    assert ModelBudget(100).allocate(EMOTION_CLASSIFIER).name == "simulation"
+
+
+def test_fallback_after_failed_load_and_reallocation_releases():
+    budget = ModelBudget(2048)
+    budget.allocate(EMOTION_CLASSIFIER, ["onnx-int8", "pytorch"])
+    variant = budget.fallback(EMOTION_CLASSIFIER, "load error")
+    assert variant.name == "pytorch"
+    assert "onnx-int8 failed" in budget.stats()["components"][EMOTION_CLASSIFIER]["reason"]
+    assert budget.fallback(EMOTION_CLASSIFIER, "load error").name == "simulation"
+    # The last resort is sticky
+    assert budget.fallback(EMOTION_CLASSIFIER, "again").name == "simulation"
+
+    # A second instance of the same component replaces, not adds to, its reservation
+    budget.allocate(EMOTION_CLASSIFIER)
+    budget.allocate(EMOTION_CLASSIFIER)
+    assert budget.stats()["allocated_mb"] == 700
+
+
+def test_external_models_take_no_local_budget():
+    budget = ModelBudget(100)
+    budget.record_external(EMBEDDER, "sidecar", "served at /tmp/x.sock")
+    stats = budget.stats()
+    assert stats["allocated_mb"] == 0
+    assert stats["components"][EMBEDDER]["variant"] == "sidecar"
+
+
+def test_mirror_loads_quantized_model_under_tight_budget():
+    sentinel = object()
+    with patch("app.emotion.neuro_empathic_mirror.HAS_TRANSFORMERS", True), \
+            patch.object(NeuroEmpathicMirror, "_init_pytorch_model") as pytorch_loader, \
+            patch.object(NeuroEmpathicMirror, "_init_onnx_model", return_value=sentinel), \
+            patch.object(NeuroEmpathicMirror, "_init_batcher", return_value=None):
+        mirror = NeuroEmpathicMirror(model_budget=ModelBudget(300))
+    assert mirror.analyzer is sentinel
+    pytorch_loader.assert_not_called()
+    assert mirror.budget.stats()["components"][EMOTION_CLASSIFIER]["variant"] == "onnx-int8"
+
+
+def test_mirror_falls_through_failed_variants_to_simulation():
+    with patch("app.emotion.neuro_empathic_mirror.HAS_TRANSFORMERS", True), \
+            patch.object(NeuroEmpathicMirror, "_init_pytorch_model", return_value=None), \
+            patch.object(NeuroEmpathicMirror, "_init_onnx_model", return_value=None) as onnx_loader:
+        mirror = NeuroEmpathicMirror(model_budget=ModelBudget(2048))
+    assert mirror.analyzer is None
+    onnx_loader.assert_called_once()
+    assert mirror.budget.stats()["components"][EMOTION_CLASSIFIER]["variant"] == "simulation"
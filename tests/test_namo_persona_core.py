@@ -41,7 +41,8 @@ async def test_namo_persona_core_process():
     assert "Mindfulness is key." in result["reflection_text"]
     assert result["dhamma_tags"] == ["compassionate"]
 
-    # Verify interactions
+    # Verify interactions (the memory store runs in the background)
+    await core.drain()
     mock_mirror.reflect.assert_called_once_with("I am feeling great today!")
     mock_memory.store_memory.assert_called_once()
     mock_reflection.reflect.assert_called_once()
@@ -70,3 +71,105 @@ async def test_namo_persona_core_process_memory_disabled():
 
         assert "Memory system inactive" in result["memory_summary"]
         mock_memory.store_memory.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_process_stream_yields_stages_in_order():
+    mock_mirror = MagicMock()
+    mock_mirror.reflect.return_value = EmpathicResponse("I hear you.", 0.7, "Medium")
+    mock_memory = MagicMock()
+    mock_memory.retrieve_context.return_value = ["earlier chat"]
+    mock_reflection = MagicMock()
+    mock_reflection.reflect.return_value = {"reflection": "Breathe.", "moral_index": 0.5, "tone": "calm"}
+
+    core = NamoPersonaCore(
+        empathic_mirror=mock_mirror,
+        infinity_memory=mock_memory,
+        reflection_engine=mock_reflection,
+    )
+    events = [event async for event in core.process_stream("hello", user_id="u1")]
+
+    # empathy and memory run concurrently, so they may arrive in either order
+    assert {event["event"] for event in events[:2]} == {"empathy", "memory"}
+    assert [event["event"] for event in events[2:]] == ["reflection", "done"]
+    by_name = {event["event"]: event for event in events}
+    assert by_name["empathy"]["response_text"] == "I hear you."
+    assert "earlier chat" in by_name["memory"]["memory_context"]
+    assert by_name["reflection"]["dhamma_tags"] == ["calm"]
+    assert by_name["done"]["result"]["reflection_text"] == "I hear you.\n\nBreathe."
+
+@pytest.mark.asyncio
+async def test_memory_store_runs_after_the_reply():
+    mock_mirror = MagicMock()
+    mock_mirror.reflect.return_value = EmpathicResponse("Hi.", 0.6, "Medium")
+    mock_memory = MagicMock()
+    mock_memory.retrieve_context.return_value = []
+    mock_memory.embed.return_value = [0.1, 0.2]
+    mock_reflection = MagicMock()
+    mock_reflection.reflect.return_value = {"reflection": "Rest."}
+
+    core = NamoPersonaCore(
+        empathic_mirror=mock_mirror,
+        infinity_memory=mock_memory,
+        reflection_engine=mock_reflection,
+    )
+    result = await core.process("hello", user_id="u1")
+
+    assert set(result["stage_timings_ms"]) == {"empathy", "embedding", "recall", "reflection"}
+    # Recall and store share the single per-turn embedding
+    assert mock_memory.retrieve_context.call_args.kwargs["embedding"] == [0.1, 0.2]
+    await core.drain()
+    mock_memory.store_memory.assert_called_once()
+    assert mock_memory.store_memory.call_args.kwargs["embedding"] == [0.1, 0.2]
+
+@pytest.mark.asyncio
+async def test_process_batch_makes_one_call_per_stage_and_keeps_order():
+    mock_mirror = MagicMock()
+    mock_mirror.reflect_batch.side_effect = lambda texts: [EmpathicResponse(f"re {t}", 0.5, "Medium") for t in texts]
+    mock_memory = MagicMock()
+    mock_memory.embed_batch.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    mock_memory.retrieve_context_batch.side_effect = lambda texts, vectors, users: [[] for _ in texts]
+    mock_reflection = MagicMock()
+    mock_reflection.reflect.return_value = {"reflection": "Rest."}
+
+    core = NamoPersonaCore(
+        empathic_mirror=mock_mirror,
+        infinity_memory=mock_memory,
+        reflection_engine=mock_reflection,
+    )
+    results = await core.process_batch([("one", "u1"), ("two", "u2"), ("three", "u1")])
+    await core.drain()
+
+    assert [result["reflection_text"] for result in results] == ["re one\n\nRest.", "re two\n\nRest.", "re three\n\nRest."]
+    mock_mirror.reflect_batch.assert_called_once_with(["one", "two", "three"])
+    mock_memory.embed_batch.assert_called_once_with(["one", "two", "three"])
+    mock_memory.retrieve_context_batch.assert_called_once()
+    mock_memory.store_memories.assert_called_once()
+    assert mock_memory.store_memories.call_args.args[3] == ["u1", "u2", "u1"]
+    mock_memory.store_memory.assert_not_called()
+    assert set(results[0]["stage_timings_ms"]) == {"empathy", "embedding", "recall", "reflection"}
+
+@pytest.mark.asyncio
+async def test_overloaded_background_store_is_retried_then_counted():
+    from app.core.execution import StageOverloadedError
+
+    mock_memory = MagicMock()
+    core = NamoPersonaCore(empathic_mirror=MagicMock(), infinity_memory=mock_memory, reflection_engine=MagicMock())
+    attempts = []
+
+    async def busy_then_free(stage, fn, *args, **kwargs):
+        attempts.append(stage)
+        if len(attempts) < 3:
+            raise StageOverloadedError(stage)
+        return fn(*args, **kwargs)
+
+    with patch("app.personality.namo_persona_core._STORE_RETRY_DELAYS_S", (0, 0)):
+        with patch.object(core.executor, "run", side_effect=busy_then_free):
+            core._store_in_background(mock_memory.store_memory, "hi")
+            await core.drain()
+        mock_memory.store_memory.assert_called_once_with("hi")
+        assert core.store_stats()["retried"] == 2 and core.store_stats()["stored"] == 1
+
+        with patch.object(core.executor, "run", side_effect=StageOverloadedError("io")):
+            core._store_in_background(mock_memory.store_memory, "lost")
+            await core.drain()
+    assert core.store_stats()["dropped"] == 1
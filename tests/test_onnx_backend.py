@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.emotion.onnx_backend import INT8_FILENAME, OnnxEmotionClassifier, is_complete_export
+from benchmarks.bench_emotion_backends import CORPUS
+
+
+class FakeSession:
+    def __init__(self, logits):
+        self.logits = np.asarray(logits, dtype=np.float32)
+        self.feeds = None
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+    def run(self, outputs, feeds):
+        self.feeds = feeds
+        return [self.logits[: len(feeds["input_ids"])]]
+
+
+def fake_tokenizer(batch, **kwargs):
+    assert kwargs["return_tensors"] == "np"
+    return {
+        "input_ids": np.ones((len(batch), 4), dtype=np.int32),
+        "attention_mask": np.ones((len(batch), 4), dtype=np.int32),
+        "token_type_ids": np.zeros((len(batch), 4), dtype=np.int32),
+    }
+
+
+def test_outputs_match_pipeline_shape():
+    session = FakeSession([[0.0, 2.0, 1.0], [3.0, 0.0, 0.0]])
+    classifier = OnnxEmotionClassifier(session, fake_tokenizer, {0: "sadness", 1: "joy", 2: "love"})
+
+    results = classifier(["a", "b"], batch_size=2)
+    assert [r[0]["label"] for r in results] == ["joy", "sadness"]
+    assert all(abs(sum(item["score"] for item in r) - 1.0) < 1e-9 for r in results)
+    assert results[0][0]["score"] > results[0][1]["score"] > results[0][2]["score"]
+    # Only the inputs the graph declares are fed, as int64
+    assert set(session.feeds) == {"input_ids", "attention_mask"}
+    assert session.feeds["input_ids"].dtype == np.int64
+
+    # A single string is wrapped like pipeline(text)[0]
+    assert classifier("a")[0][0]["label"] == "joy"
+    assert classifier([]) == []
+
+
+def test_truncates_at_the_tokenizer_model_limit_by_default():
+    seen = {}
+
+    def tokenizer(batch, **kwargs):
+        seen.update(kwargs)
+        return fake_tokenizer(batch, **kwargs)
+
+    tokenizer.model_max_length = 512
+    classifier = OnnxEmotionClassifier(FakeSession([[0.0, 1.0]]), tokenizer, {0: "sadness", 1: "joy"})
+    classifier(["a"])
+    assert seen["max_length"] == 512
+    assert OnnxEmotionClassifier(FakeSession([[0.0, 1.0]]), tokenizer, {}, max_length=64).max_length == 64
+
+
+# Well past 128 tokens, with the feeling only stated at the end
+LONG_CORPUS = (
+    "Today I walked to the station, bought a ticket, read the timetable, and waited on the platform. " * 8
+    + "When the train finally came I burst into tears because I miss my brother so much.",
+    "The meeting covered the budget, the schedule, the office move, and the new printer. " * 8
+    + "Then my manager said I was promoted and I am overjoyed!",
+)
+
+
+def test_int8_onnx_matches_pytorch_on_fixed_corpus(tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from app.emotion.neuro_empathic_mirror import EMOTION_MODEL_ID
+
+    try:
+        reference = transformers.pipeline("text-classification", model=EMOTION_MODEL_ID, top_k=None)
+        candidate = OnnxEmotionClassifier.from_pretrained(tmp_path_factory.mktemp("onnx"), EMOTION_MODEL_ID)
+    except OSError as exc:  # model weights not downloadable (offline CI)
+        pytest.skip(f"emotion model unavailable: {exc}")
+
+    corpus = list(CORPUS + LONG_CORPUS)
+    assert all(len(candidate.tokenizer(text)["input_ids"]) > 128 for text in LONG_CORPUS)
+    expected = reference(corpus, batch_size=len(corpus))
+    actual = candidate(corpus)
+    agree = sum(e[0]["label"] == a[0]["label"] for e, a in zip(expected, actual))
+    assert agree / len(corpus) >= 0.95
+    for e, a in zip(expected, actual):
+        reference_scores = {item["label"]: item["score"] for item in e}
+        for item in a:
+            assert abs(item["score"] - reference_scores[item["label"]]) < 0.1
+
+
+def test_interrupted_export_is_not_treated_as_complete(tmp_path):
+    # A crash after quantization used to leave only the model file behind
+    (tmp_path / INT8_FILENAME).write_bytes(b"onnx")
+    assert not is_complete_export(tmp_path)
+
+    (tmp_path / "config.json").write_text("{}")
+    (tmp_path / "tokenizer_config.json").write_text("{}")
+    assert is_complete_export(tmp_path)
@@ -0,0 +1,61 @@
+import json
+import multiprocessing
+
+from app.memory.persistence_adapter import PersistenceAdapter
+
+
+def test_append_and_load_keep_the_retention_tail(tmp_path):
+    adapter = PersistenceAdapter(tmp_path / "log.json", max_entries=3)
+    for i in range(5):
+        adapter.append({"i": i})
+    assert [entry["i"] for entry in adapter.load()] == [2, 3, 4]
+    assert adapter.path.suffix == ".jsonl"
+
+
+def test_journal_is_compacted_past_the_threshold(tmp_path):
+    adapter = PersistenceAdapter(tmp_path / "log.json", max_entries=5, compact_factor=2)
+    for i in range(11):
+        adapter.append({"i": i})
+    lines = adapter.path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) <= 10
+    assert json.loads(lines[-1]) == {"i": 10}
+    assert [entry["i"] for entry in adapter.load()] == [6, 7, 8, 9, 10]
+
+
+def test_legacy_json_array_is_migrated(tmp_path):
+    legacy = tmp_path / "memory_log.json"
+    legacy.write_text(json.dumps([{"i": i} for i in range(4)]), encoding="utf-8")
+
+    adapter = PersistenceAdapter(legacy, max_entries=3)
+
+    assert [entry["i"] for entry in adapter.load()] == [1, 2, 3]
+    assert (tmp_path / "memory_log.jsonl").exists()
+    adapter.append({"i": 4})
+    # Re-opening does not import the legacy file a second time
+    assert [entry["i"] for entry in PersistenceAdapter(legacy, max_entries=10).load()] == [1, 2, 3, 4]
+
+
+def test_load_sees_writes_from_another_adapter(tmp_path):
+    writer = PersistenceAdapter(tmp_path / "log.json", max_entries=10)
+    reader = PersistenceAdapter(tmp_path / "log.json", max_entries=10)
+    writer.append({"from": "writer"})
+    assert reader.load() == [{"from": "writer"}]
+
+
+def _append_many(path, worker, count):
+    adapter = PersistenceAdapter(path, max_entries=1000)
+    for i in range(count):
+        adapter.append({"worker": worker, "i": i})
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    path = tmp_path / "log.json"
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_append_many, args=(path, w, 50)) for w in range(4)]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join(30)
+
+    entries = PersistenceAdapter(path, max_entries=1000).load()
+    assert len(entries) == 200
@@ -0,0 +1,71 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.memory.reranker import epoch_us, rerank, score_candidates
+
+PHI = 1.61803398875
+NOW = datetime(2025, 6, 1, 12, 0, 0)
+
+
+def legacy_scores(metadatas, now):
+    """The original per-hit loop from InfinityMemorySystem.retrieve_context."""
+    scores = []
+    for meta in metadatas:
+        timestamp = meta.get("timestamp") if isinstance(meta, dict) else None
+        intensity = float(meta.get("intensity", 0.0)) if isinstance(meta, dict) else 0.0
+        if timestamp:
+            try:
+                hours_passed = (now - datetime.fromisoformat(timestamp)).total_seconds() / 3600
+                temporal = 1.0 / (PHI ** (hours_passed / 24.0))
+            except Exception:
+                temporal = 1.0
+        else:
+            temporal = 1.0
+        scores.append(temporal * max(intensity, 0.0))
+    return scores
+
+
+def make_metadatas(n, seed=7):
+    rng = random.Random(seed)
+    metadatas = []
+    for _ in range(n):
+        ts = NOW - timedelta(seconds=rng.randint(0, 90 * 86400), microseconds=rng.randint(0, 999_999))
+        metadatas.append({"timestamp": ts.isoformat(), "intensity": rng.uniform(-0.2, 1.0)})
+    metadatas += [{"intensity": 0.5}, {"timestamp": "not-a-date", "intensity": 0.4}, "not a dict"]
+    return metadatas
+
+
+def test_scores_are_bit_identical_to_legacy_formula():
+    metadatas = make_metadatas(5000)
+    vectorized = score_candidates(metadatas, PHI, now=NOW)
+    assert vectorized.tolist() == legacy_scores(metadatas, NOW)
+
+
+def test_epoch_field_matches_iso_timestamp_to_the_bit():
+    iso_only = make_metadatas(2000, seed=5)
+    with_epoch = [
+        {**meta, "epoch_us": epoch_us(datetime.fromisoformat(meta["timestamp"]))}
+        if isinstance(meta, dict) and meta.get("timestamp", "").startswith("20")
+        else meta
+        for meta in iso_only
+    ]
+    assert score_candidates(with_epoch, PHI, now=NOW).tolist() == score_candidates(iso_only, PHI, now=NOW).tolist()
+    assert score_candidates(with_epoch, PHI, now=NOW).tolist() == legacy_scores(iso_only, NOW)
+
+
+def test_rerank_order_matches_legacy_sort():
+    metadatas = make_metadatas(200, seed=11)
+    documents = [f"doc{i}" for i in range(len(metadatas))]
+    legacy = sorted(zip(documents, legacy_scores(metadatas, NOW)), key=lambda item: item[1], reverse=True)
+    assert rerank(documents, metadatas, PHI, now=NOW) == [doc for doc, _ in legacy]
+
+
+def test_overfetch_uses_similarity_and_truncates_to_k():
+    metadatas = [{"epoch_us": epoch_us(NOW), "intensity": 0.5}] * 3
+    documents = ["orthogonal", "aligned", "opposite"]
+    embeddings = [[0.0, 1.0], [1.0, 0.0], [-1.0, 0.0]]
+    ranked = rerank(documents, metadatas, PHI, k=1, now=NOW, query_embedding=[1.0, 0.0], embeddings=embeddings)
+    assert ranked == ["aligned"]
+    assert np.all(score_candidates(metadatas, PHI, now=NOW) == 0.5)
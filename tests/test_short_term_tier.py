@@ -0,0 +1,38 @@
+from unittest.mock import patch
+
+from app.memory.short_term_tier import LocalHotStore, ShortTermTier
+
+
+def test_tier_keeps_most_recent_turns_first():
+    tier = ShortTermTier(LocalHotStore(), ttl_seconds=60, max_turns=2)
+    for i in range(3):
+        tier.push("u", {"text": f"turn{i}"})
+
+    assert [turn["text"] for turn in tier.recent("u")] == ["turn2", "turn1"]
+    assert tier.recent("someone-else") == []
+
+
+def test_local_store_expires_keys():
+    store = LocalHotStore()
+    tier = ShortTermTier(store, ttl_seconds=10, max_turns=5)
+    with patch("app.memory.short_term_tier.time.monotonic", return_value=100.0):
+        tier.push("u", {"text": "hello"})
+    with patch("app.memory.short_term_tier.time.monotonic", return_value=109.0):
+        assert len(tier.recent("u")) == 1
+    with patch("app.memory.short_term_tier.time.monotonic", return_value=110.0):
+        assert tier.recent("u") == []
+
+
+def test_backend_errors_are_counted_not_raised():
+    class BrokenClient:
+        def pipeline(self):
+            raise ConnectionError("down")
+
+        def lrange(self, *args):
+            raise ConnectionError("down")
+
+    tier = ShortTermTier(BrokenClient(), ttl_seconds=10, max_turns=5)
+    tier.push("u", {"text": "x"})
+    assert tier.recent("u") == []
+    assert tier.stats()["errors"] == 2
+    assert tier.stats()["backend"] == "redis"
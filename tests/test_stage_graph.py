@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.core.stage_graph import Stage, StageGraph
+
+
+@pytest.mark.asyncio
+async def test_independent_stages_overlap():
+    running = []
+    overlapped = asyncio.Event()
+
+    def stage(name):
+        async def fn():
+            running.append(name)
+            if len(running) == 2:
+                overlapped.set()
+            await asyncio.wait_for(overlapped.wait(), timeout=1)
+            return name
+
+        return fn
+
+    graph = StageGraph([Stage("a", stage("a")), Stage("b", stage("b"))])
+    assert await graph.run() == {"a": "a", "b": "b"}
+    assert set(graph.timings_ms) == {"a", "b"}
+
+
+@pytest.mark.asyncio
+async def test_dependency_results_are_passed_as_keywords():
+    async def one():
+        return 1
+
+    async def two():
+        return 2
+
+    async def total(one, two):
+        return one + two
+
+    graph = StageGraph([Stage("total", total, deps=("one", "two")), Stage("one", one), Stage("two", two)])
+    results = [item async for item in graph.run_iter()]
+
+    assert results[-1] == ("total", 3)
+
+
+def test_invalid_graphs_are_rejected():
+    async def noop(**_):
+        return None
+
+    with pytest.raises(ValueError, match="unknown"):
+        StageGraph([Stage("a", noop, deps=("missing",))])
+    with pytest.raises(ValueError, match="cycle"):
+        StageGraph([Stage("a", noop, deps=("b",)), Stage("b", noop, deps=("a",))])
+    with pytest.raises(ValueError, match="unique"):
+        StageGraph([Stage("a", noop), Stage("a", noop)])
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_pending_stages():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    graph = StageGraph([Stage("slow", slow), Stage("broken", broken)])
+    with pytest.raises(RuntimeError, match="boom"):
+        await graph.run()
+    assert cancelled.is_set()
@@ -0,0 +1,58 @@
+import threading
+
+from app.core.warmup import FAILED, PENDING, READY, WARMING, WarmupManager
+
+
+def test_background_warmup_swaps_in_components():
+    published = {}
+    release = threading.Event()
+
+    def slow_loader():
+        release.wait(5)
+        return "model"
+
+    manager = WarmupManager()
+    manager.register("model", slow_loader, lambda value: published.update(model=value))
+    manager.register("db", lambda: "db", lambda value: published.update(db=value))
+    assert manager.status()["model"]["state"] == PENDING
+
+    manager.start()
+    assert manager.status()["model"]["state"] == WARMING
+    assert not manager.is_ready()
+
+    release.set()
+    assert manager.wait(timeout=5)
+    assert manager.is_ready()
+    assert published == {"model": "model", "db": "db"}
+    assert manager.status()["db"]["duration_s"] is not None
+
+
+def test_failed_component_is_reported_and_not_published():
+    published = []
+
+    def broken():
+        raise RuntimeError("no weights")
+
+    manager = WarmupManager()
+    manager.register("model", broken, published.append)
+    manager.warm_all()
+
+    status = manager.status()["model"]
+    assert status["state"] == FAILED
+    assert "no weights" in status["error"]
+    assert published == []
+    assert not manager.is_ready("model")
+    # Warming again is a no-op once a component has left the pending state
+    manager.start()
+    assert manager.status()["model"]["state"] == FAILED
+
+
+def test_start_is_idempotent():
+    calls = []
+    manager = WarmupManager()
+    manager.register("x", lambda: calls.append(1), lambda _: None)
+    manager.start()
+    manager.start()
+    manager.wait(timeout=5)
+    assert calls == [1]
+    assert manager.status()["x"]["state"] == READY
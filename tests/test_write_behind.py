@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+from app.memory.write_behind import WriteBehindBuffer
+
+
+def test_records_are_flushed_in_bulk_on_close():
+    batches = []
+    buffer = WriteBehindBuffer(batches.append, max_batch_size=10, flush_interval_ms=10_000)
+    for i in range(25):
+        assert buffer.put({"id": i})
+    buffer.close()
+
+    assert [record["id"] for batch in batches for record in batch] == list(range(25))
+    assert max(len(batch) for batch in batches) <= 10
+    assert buffer.stats()["flushed"] == 25
+
+
+def test_flush_is_triggered_by_interval():
+    flushed = threading.Event()
+    buffer = WriteBehindBuffer(lambda batch: flushed.set(), max_batch_size=100, flush_interval_ms=5)
+    buffer.put({"id": 1})
+    assert flushed.wait(2.0)
+    buffer.close()
+
+
+def test_drop_policy_discards_when_full():
+    gate = threading.Event()
+    buffer = WriteBehindBuffer(lambda batch: gate.wait(2.0), max_batch_size=1, max_queue_size=1)
+    results = [buffer.put({"id": i}) for i in range(5)]
+    gate.set()
+    buffer.close()
+
+    assert results.count(False) >= 1
+    assert buffer.stats()["dropped"] == results.count(False)
+
+
+def test_sink_failures_are_counted():
+    def sink(batch):
+        raise IOError("disk full")
+
+    buffer = WriteBehindBuffer(sink, max_batch_size=5)
+    buffer.put({"id": 1})
+    buffer.close()
+    assert buffer.stats()["failed"] == 1
+
+
+def test_put_after_close_raises_and_bad_policy_rejected():
+    buffer = WriteBehindBuffer(lambda batch: None)
+    buffer.close()
+    with pytest.raises(RuntimeError):
+        buffer.put({"id": 1})
+    with pytest.raises(ValueError):
+        WriteBehindBuffer(lambda batch: None, overflow_policy="spill")